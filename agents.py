@@ -7,13 +7,80 @@ load_dotenv()
 # Correct import:
 from crewai import Agent, LLM
 
-from tools import search_tool, FinancialDocumentTool
+import time
+
+import crewai
+
+from tools import search_tool, document_tools
+from cache import LLMResponseCache, LLM_CACHE_ENABLED, hash_files, active_document
+from timing import active_timer
+
+
+class CachedLLM(LLM):
+    """
+    LLM that serves repeated prompts from a persistent SQLite response cache.
+
+    The key covers the model, sampling settings, the full message list (which
+    already carries tool outputs as observations), the tool schemas, a
+    prompt-template version hash, so any prompt change invalidates old entries,
+    and the content hash of the document under analysis (cache.document_scope),
+    so the same query on two documents never shares an entry. Calls made
+    outside a document scope are not cached.
+    """
+
+    def __init__(self, *args, response_cache: LLMResponseCache = None, template_version: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response_cache = response_cache
+        self.template_version = template_version
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        start = time.perf_counter()
+        response, cached = self._cached_call(messages, tools, callbacks, available_functions)
+
+        timer = active_timer()
+        if timer is not None:
+            timer.record_llm_call(self.model, time.perf_counter() - start, cached)
+        return response
+
+    def _cached_call(self, messages, tools, callbacks, available_functions):
+        """Return (response, served_from_cache)."""
+        document = active_document()
+        if self.response_cache is None or document is None:
+            return super().call(messages, tools, callbacks, available_functions), False
+
+        key = self.response_cache.make_key(
+            document=document,
+            model=self.model,
+            temperature=self.temperature,
+            stop=self.stop,
+            messages=messages,
+            tools=tools,
+            template_version=self.template_version,
+        )
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached, True
+
+        response = super().call(messages, tools, callbacks, available_functions)
+        # Only plain completions are cached; native function-call results are not.
+        if isinstance(response, str):
+            self.response_cache.put(key, self.model, response)
+        return response, False
+
+
+# Agent/task prompts live in these files, plus crewai's own prompt templates.
+_here = os.path.dirname(os.path.abspath(__file__))
+PROMPT_TEMPLATE_VERSION = f"{crewai.__version__}-" + hash_files(
+    [os.path.join(_here, "agents.py"), os.path.join(_here, "task.py")]
+)
 
 # BUG FIX 7: 'llm = llm' is a NameError — 'llm' was never defined.
 # Load the LLM properly using environment variables.
-llm = LLM(
+llm = CachedLLM(
     model=os.getenv("MODEL", "openai/gpt-4o-mini"),
     api_key=os.getenv("OPENAI_API_KEY"),
+    response_cache=LLMResponseCache() if LLM_CACHE_ENABLED else None,
+    template_version=PROMPT_TEMPLATE_VERSION,
 )
 
 # PROMPT FIX: The original goal and backstory encouraged hallucination, fabricating
@@ -35,7 +102,7 @@ financial_analyst = Agent(
         "You always cite specific figures from the document and clearly distinguish between "
         "facts, analysis, and opinion. You adhere to SEC guidelines and never fabricate data."
     ),
-    tools=[FinancialDocumentTool.read_data_tool],
+    tools=document_tools(),
     # BUG FIX 8: Parameter was 'tool' (singular) — correct CrewAI param is 'tools' (plural).
     llm=llm,
     max_iter=5,   # BUG FIX 9: max_iter=1 prevents agents from retrying on tool errors.
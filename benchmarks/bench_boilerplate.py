@@ -0,0 +1,82 @@
+"""
+Benchmark: tokens removed by cross-page boilerplate stripping.
+
+Extracts synthetic filings whose pages carry a running header, a legal
+banner and a page-number footer, and reports the document's tokens before
+(raw page text) and after stripping, the lines removed and the time the
+detector adds to extraction. First checks that a short earnings release
+keeps its statement unit lines and small-amount edge rows.
+
+Run from the repository root:
+    python -m benchmarks.bench_boilerplate --pages 20,100,400
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def _release_pages(pages: int = 5) -> list:
+    """An earnings release: statement pages open with the same unit and period lines."""
+    text = ["Q4 2024 results: revenue up 8% year over year.\nOutlook for 2025 unchanged.\n- 1 -"]
+    for n in range(2, pages + 1):
+        text.append("(In millions, except per share data)\n2024 2023\n"
+                    "Total revenue 4,512 4,130\nOperating income 801 722\n"
+                    f"Net income {500 + n} {420 + n}\nPage {n} of {pages}")
+    return text
+
+
+def check_short_release():
+    """Exit with an error if stripping costs a short release its unit or its rows."""
+    from extraction import strip_boilerplate
+    from tables import parse_statement
+
+    pages = _release_pages()
+    # Once with the defaults (too short to strip), once forcing the detector to run.
+    for min_pages in (None, 1):
+        kwargs = {} if min_pages is None else {"min_pages": min_pages}
+        stripped, _ = strip_boilerplate(pages, **kwargs)
+        frame, unit = parse_statement("\n".join(stripped[1:]))
+        rows = frame["line_item"].value_counts().get("Net income", 0)
+        page_numbers_left = min_pages is not None and "Page" in "".join(stripped)
+        if unit != "millions" or rows != len(pages) - 1 or page_numbers_left:
+            raise SystemExit(f"short release check failed (min_pages={min_pages}): "
+                             f"unit {unit}, {rows} 'Net income' rows")
+    print("short release check: unit lines and edge rows kept, page numbers stripped\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", default="20,100,400", help="comma-separated page counts")
+    parser.add_argument("--lines-per-page", type=int, default=60)
+    args = parser.parse_args()
+
+    from extraction import iter_pages, strip_boilerplate
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+    from benchmarks.bench_passage_retrieval import _token_counter
+
+    check_short_release()
+    count_tokens, counter_name = _token_counter()
+    print(f"tokens: {counter_name}\n")
+    print(f"{'pages':>6} {'footer':>7} {'before tok':>11} {'after tok':>10} {'saved':>7} "
+          f"{'lines removed':>14} {'strip ms':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in (int(p) for p in args.pages.split(",")):
+            for footer in (False, True):
+                path = write_synthetic_pdf(os.path.join(tmp, f"filing_{pages}_{footer}.pdf"), pages,
+                                           lines_per_page=args.lines_per_page, footer=footer)
+                raw = list(iter_pages(path))
+                start = time.perf_counter()
+                stripped, removed = strip_boilerplate(raw)
+                elapsed = time.perf_counter() - start
+
+                before = count_tokens("".join(f"{page}\n" for page in raw))
+                after = count_tokens("".join(f"{page}\n" for page in stripped))
+                print(f"{pages:>6} {'yes' if footer else 'no':>7} {before:>11,} {after:>10,} "
+                      f"{1 - after / before:>6.1%} {removed:>14,} {elapsed * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
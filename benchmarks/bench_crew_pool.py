@@ -0,0 +1,67 @@
+"""
+Benchmark: per-task Crew construction vs borrowing from the warm crew pool.
+
+Times what each analysis paid before the pool (building a Crew around the
+shared agent and task) against acquiring and resetting a pooled crew, and
+reports the one-off cost of building an isolated crew at startup. No LLM
+calls are made.
+
+Run from the repository root:
+    python -m benchmarks.bench_crew_pool --runs 50
+"""
+
+import argparse
+import statistics
+import time
+
+from crewai import Crew, Process
+
+from agents import financial_analyst
+from crew_pool import CrewPool, build_analysis_crew
+from notifier import report_step
+from task import analysis_task
+
+
+def _time(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _per_task_crew():
+    Crew(
+        agents=[financial_analyst],
+        tasks=[analysis_task],
+        process=Process.sequential,
+        step_callback=report_step,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    pool = CrewPool(size=1)
+    pool.warm()
+
+    def _borrow():
+        with pool.crew():
+            pass
+
+    results = {
+        "per-task Crew()": _time(_per_task_crew, args.runs),
+        "isolated build": _time(build_analysis_crew, args.runs),
+        "pool borrow": _time(_borrow, args.runs),
+    }
+    for label, samples in results.items():
+        print(f"{label:<16} median: {statistics.median(samples) * 1000:>8.3f} ms   "
+              f"max: {max(samples) * 1000:>8.3f} ms")
+    print(f"pool stats: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Microbenchmark: PDF text extraction, seconds per 100 pages.
+
+Compares the previous read_data_tool body (PyPDFLoader.load(), a
+`while "\\n\\n" in content` loop and `+=` concatenation) with the
+streaming extractor in extraction.py, serial and process-pool parallel,
+on a synthetic large filing.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction --pages 600
+"""
+
+import argparse
+import functools
+import os
+import tempfile
+import time
+
+from extraction import extract_text
+from benchmarks.synthetic_pdf import write_synthetic_pdf
+
+
+def legacy_read(path: str) -> str:
+    """The pre-streaming read_data_tool implementation, kept for comparison."""
+    from langchain_community.document_loaders import PyPDFLoader
+
+    docs = PyPDFLoader(file_path=path).load()
+    full_report = ""
+    for data in docs:
+        content = data.page_content
+        while "\n\n" in content:
+            content = content.replace("\n\n", "\n")
+        full_report += content + "\n"
+    return full_report
+
+
+def _time(fn, path: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pdf(os.path.join(tmp, "synthetic_10k.pdf"), args.pages)
+
+        serial = functools.partial(extract_text, parallel=False)
+        parallel = functools.partial(extract_text, parallel=True)
+        assert serial(path) == parallel(path), "serial and parallel extraction disagree"
+
+        per_100 = 100 / args.pages
+        timings = {
+            "legacy": _time(legacy_read, path, args.repeat),
+            "streaming": _time(serial, path, args.repeat),
+            "parallel": _time(parallel, path, args.repeat),
+        }
+
+    print(f"pages: {args.pages}  workers: {os.getenv('EXTRACTION_WORKERS', os.cpu_count())}")
+    for name, seconds in timings.items():
+        print(f"{name:<10}: {seconds * per_100:.3f} s / 100 pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: LLM response cache hits vs provider calls.
+
+Drives CachedLLM with an offline provider that sleeps for --provider-ms per
+call, and reports the latency of a miss (provider call + cache write) against
+a hit. First checks that the same messages for two different documents do
+not share a cache entry, and that calls outside a document scope bypass the
+cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_llm_cache --calls 200 --provider-ms 50
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--provider-ms", type=float, default=50.0, help="simulated provider latency")
+    args = parser.parse_args()
+
+    from crewai import LLM
+    from agents import CachedLLM
+    from cache import LLMResponseCache, document_scope
+
+    provider_calls = []
+
+    class _OfflineProvider(LLM):
+        def call(self, messages, tools=None, callbacks=None, available_functions=None):
+            provider_calls.append(messages)
+            time.sleep(args.provider_ms / 1000)
+            return f"analysis #{len(provider_calls)}"
+
+    class OfflineLLM(CachedLLM, _OfflineProvider):
+        """CachedLLM whose provider is the sleeping stub above."""
+
+    tmp = tempfile.mkdtemp()
+    llm = OfflineLLM(model="offline/stub", response_cache=LLMResponseCache(os.path.join(tmp, "llm.db")),
+                     template_version="bench")
+    messages = [{"role": "user", "content": "Analyze this financial document for investment insights"}]
+
+    with document_scope("a" * 64):
+        first = llm.call(messages)
+        again = llm.call(messages)
+    with document_scope("b" * 64):
+        other = llm.call(messages)
+    unscoped = [llm.call(messages), llm.call(messages)]
+    if first != again or other == first or len(provider_calls) != 4 or unscoped[0] == unscoped[1]:
+        raise SystemExit(f"document isolation check failed: {first!r} {again!r} {other!r} {unscoped!r}")
+    print("document isolation check: same query on two documents -> two entries; unscoped calls not cached\n")
+
+    misses, hits = [], []
+    for i in range(args.calls):
+        prompt = [{"role": "user", "content": f"query {i}"}]
+        with document_scope(f"{i:064x}"):
+            for samples in (misses, hits):
+                start = time.perf_counter()
+                llm.call(prompt)
+                samples.append(time.perf_counter() - start)
+
+    for label, samples in (("miss (provider)", misses), ("hit (cache)", hits)):
+        print(f"{label:<16} p50 {statistics.median(samples) * 1000:>8.2f} ms   "
+              f"max {max(samples) * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
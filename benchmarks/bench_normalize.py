@@ -0,0 +1,66 @@
+"""
+Benchmark: text normalization on multi-megabyte inputs.
+
+Compares the slicing loop analyze_investment_tool used to run (quadratic:
+every double space copies the rest of the string) with
+extraction.normalize_text. The legacy loop is only timed up to
+--legacy-max-mb because it grows quadratically.
+
+Run from the repository root:
+    python -m benchmarks.bench_normalize --sizes 1 4 16
+"""
+
+import argparse
+import random
+import time
+
+from extraction import normalize_text
+
+
+def legacy_collapse_double_spaces(text: str) -> str:
+    """The pre-normalizer analyze_investment_tool body, kept for comparison."""
+    processed_data = text
+    i = 0
+    while i < len(processed_data):
+        if processed_data[i:i+2] == "  ":
+            processed_data = processed_data[:i] + processed_data[i+1:]
+        else:
+            i += 1
+    return processed_data
+
+
+def synthetic_text(size_bytes: int, seed: int = 7) -> str:
+    """10-K-like text with double spaces, blank lines, NBSPs and soft hyphens."""
+    rng = random.Random(seed)
+    words = ["Revenue", "increased", "12%", "to", "$4,512", "million", "opera\u00adting",
+             "income", "net\u00a0cash", "liquidity", "covenant", "fiscal", "2024"]
+    parts, size = [], 0
+    while size < size_bytes:
+        line = "  ".join(rng.choice(words) for _ in range(12))
+        line += "\n\n\n" if rng.random() < 0.2 else "\n"
+        parts.append(line)
+        size += len(line)
+    return "".join(parts)
+
+
+def _time(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="input sizes in MB")
+    parser.add_argument("--legacy-max-mb", type=float, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8}  {'legacy s':>10}  {'normalize_text s':>17}")
+    for mb in args.sizes:
+        text = synthetic_text(int(mb * 1024 * 1024))
+        legacy = f"{_time(legacy_collapse_double_spaces, text):.3f}" if mb <= args.legacy_max_mb else "skipped"
+        print(f"{mb:>8g}  {legacy:>10}  {_time(normalize_text, text):>17.4f}")
+
+
+if __name__ == "__main__":
+    main()
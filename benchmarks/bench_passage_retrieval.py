@@ -0,0 +1,98 @@
+"""
+Benchmark: what the document tool hands the LLM, full text vs top-k passages.
+
+For synthetic filings of several sizes, reports the prompt tokens one reader
+tool call adds (DOCUMENT_READ_MODE=full vs passages) and the tool-side latency:
+the one-off index build at extraction, a cold index load from the document
+cache, and a warm search. The tool output is resent to the LLM on every later
+iteration of the agent, so the per-call saving applies several times per run.
+
+Tokens are counted with tiktoken when it is installed (it ships with the
+CrewAI/LiteLLM stack), otherwise estimated as characters / 4.
+
+Run from the repository root:
+    python -m benchmarks.bench_passage_retrieval --pages 20,100,400
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+QUERIES = [
+    "total revenue and net income",
+    "long-term debt and interest expense",
+    "net cash provided by operating activities and capital expenditures",
+    "total current assets and total current liabilities",
+]
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text)), "tiktoken o200k_base"
+    except Exception:
+        return lambda text: len(text) // 4, "chars/4 estimate"
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", default="20,100,400", help="comma-separated page counts")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    # Must be set before cache is imported, to keep benchmark entries out of the real cache.
+    os.environ["DOCUMENT_CACHE_DIR"] = os.path.join(tmp, "documents")
+
+    import retrieval
+    from extraction import load_document
+    from retrieval import PassageIndex, load_passage_index, format_passages
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+
+    count_tokens, counter_name = _token_counter()
+    print(f"tokens: {counter_name}, top-k: {args.top_k}, {len(QUERIES)} queries\n")
+    print(f"{'pages':>6} {'full tok':>10} {'passage tok':>12} {'saved':>7} "
+          f"{'full read ms':>13} {'build ms':>9} {'cold ms':>8} {'search ms':>10}")
+
+    for pages in (int(p) for p in args.pages.split(",")):
+        path = write_synthetic_pdf(os.path.join(tmp, f"filing_{pages}.pdf"), pages)
+        document = load_document(path)  # extraction itself is the same in both modes
+
+        full_tokens = count_tokens(document.text)
+        full_read = _best(lambda: load_document(path, sha256=document.sha256), args.repeat)
+
+        build = _best(lambda: PassageIndex.build(document), args.repeat)
+        load_passage_index(path, sha256=document.sha256)  # built and cached, as at extraction
+
+        def cold_load():
+            retrieval._indexes.clear()
+            load_passage_index(path, sha256=document.sha256)
+        cold = _best(cold_load, args.repeat)
+
+        index = load_passage_index(path, sha256=document.sha256)
+        passage_tokens = statistics.mean(
+            count_tokens(format_passages(index.search(q, args.top_k), len(index))) for q in QUERIES
+        )
+        search = statistics.mean(
+            _best(lambda: index.search(q, args.top_k), args.repeat) for q in QUERIES
+        )
+
+        print(f"{pages:>6} {full_tokens:>10,} {passage_tokens:>12,.0f} {1 - passage_tokens / full_tokens:>6.1%} "
+              f"{full_read * 1000:>13.2f} {build * 1000:>9.2f} {cold * 1000:>8.2f} {search * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
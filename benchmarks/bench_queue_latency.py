@@ -0,0 +1,142 @@
+"""
+Benchmark: enqueue-to-start latency of the queue backends.
+
+Enqueues the extraction stage of synthetic analyses one at a time and
+reports how long each took from enqueue until the pipeline marked it
+`started` (read from the stored stage timings). Only the extraction stage is
+run, so no LLM is needed.
+
+- local: in-process thread pool on a temporary database
+- celery: needs Redis and a worker consuming the extraction queue that
+  uses the same DATABASE_URL as this script, started from the same directory:
+      celery -A worker worker -Q extraction --loglevel=warning
+
+Run from the repository root:
+    python -m benchmarks.bench_queue_latency --backend local --jobs 50
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+
+
+def _create_job(pdf_path: str) -> str:
+    """Store an upload and a queued record, as POST /analyze/async does."""
+    from database import SessionLocal, AnalysisRecord
+    from pipeline import upload_path
+
+    task_id = f"bench-{uuid.uuid4()}"
+    shutil.copy(pdf_path, upload_path(task_id))
+    db = SessionLocal()
+    db.add(AnalysisRecord(id=task_id, filename="bench.pdf", query="bench", status="queued"))
+    db.commit()
+    db.close()
+    return task_id
+
+
+def _started_at(task_id: str):
+    from database import SessionLocal, AnalysisRecord
+
+    db = SessionLocal()
+    try:
+        record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+        stages = json.loads(record.stage_timings)["stages"] if record.stage_timings else []
+        return next((s["ts"] for s in stages if s["stage"] == "started"), None)
+    finally:
+        db.close()
+
+
+def _cleanup(task_ids: list):
+    from database import SessionLocal, AnalysisRecord
+    from pipeline import remove_upload, upload_path
+
+    db = SessionLocal()
+    for task_id in task_ids:
+        remove_upload(upload_path(task_id))
+        record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+        if record:
+            db.delete(record)
+    db.commit()
+    db.close()
+
+
+def run(backend_name: str, jobs: int, interval: float, timeout: float) -> list:
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+    from pipeline import run_stage, extract_stage, upload_path
+
+    os.makedirs("data", exist_ok=True)
+    tmp = tempfile.mkdtemp()
+    pdf_path = os.path.join(tmp, "bench.pdf")
+    write_synthetic_pdf(pdf_path, 2)
+
+    if backend_name == "local":
+        from queue_backend import LocalQueueBackend
+        backend = LocalQueueBackend()
+        backend.start()
+
+        def submit(task_id):
+            backend.submit(run_stage, extract_stage, "started", task_id, "bench", upload_path(task_id))
+    else:
+        from worker import extract_document_task
+        backend = None
+
+        def submit(task_id):
+            extract_document_task.apply_async(args=[task_id, "bench", upload_path(task_id)])
+
+    latencies, task_ids = [], []
+    try:
+        for _ in range(jobs):
+            task_id = _create_job(pdf_path)
+            task_ids.append(task_id)
+            enqueued_at = time.time()
+            submit(task_id)
+            deadline = enqueued_at + timeout
+            while (started := _started_at(task_id)) is None and time.time() < deadline:
+                time.sleep(0.002)
+            if started is not None:
+                latencies.append(started - enqueued_at)
+            time.sleep(interval)
+    finally:
+        if backend:
+            backend.shutdown()
+        _cleanup(task_ids)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["local", "celery"], default="local")
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between jobs (s)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="max wait for a job to start (s)")
+    args = parser.parse_args()
+
+    if args.backend == "local":
+        tmp = tempfile.mkdtemp()
+        # Must be set before database is imported; the local backend would
+        # otherwise also resume real unfinished jobs from analyses.db.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'analyses.db')}"
+        from database import init_db
+        init_db()
+
+    latencies = run(args.backend, args.jobs, args.interval, args.timeout)
+    if not latencies:
+        print(f"{args.backend}: no job started within {args.timeout}s")
+        return
+    ordered = sorted(latencies)
+    print(
+        f"{args.backend:<7} started: {len(ordered)}/{args.jobs}   "
+        f"p50: {statistics.median(ordered) * 1000:>8.2f} ms   "
+        f"p95: {ordered[int(len(ordered) * 0.95) - 1] * 1000:>8.2f} ms   "
+        f"max: {ordered[-1] * 1000:>8.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: precomputed ratio block vs the statement pages the LLM would read.
+
+For a synthetic filing, reports the tokens of the `financial_ratios` block
+injected into the task prompt against the balance sheet and income
+statement pages the agent would otherwise read to derive the same ratios,
+and how long the block takes to build at extraction and to load at
+kickoff. Also times the bulk NumPy computation against a per-period Python
+loop on a long quarterly history.
+
+Run from the repository root:
+    python -m benchmarks.bench_ratio_engine --pages 200 --periods 400
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def per_period_ratios(items: pd.DataFrame) -> dict:
+    """The same ratios, one period at a time in plain Python, for comparison."""
+    out = {}
+    for period in items.columns:
+        col = items[period]
+
+        def div(a, b):
+            return a / b if b and not math.isnan(a) and not math.isnan(b) else math.nan
+
+        quick_assets = col["total_current_assets"] - col["inventories"]
+        debt = col["long_term_debt"] + col["short_term_debt"]
+        out[period] = (
+            div(col["total_current_assets"], col["total_current_liabilities"]),
+            div(quick_assets, col["total_current_liabilities"]),
+            div(debt, col["equity"]),
+            div(col["operating_income"], abs(col["interest_expense"])),
+        )
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--periods", type=int, default=400, help="periods in the synthetic history")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    # Must be set before cache is imported, to keep benchmark entries out of the real cache.
+    os.environ["DOCUMENT_CACHE_DIR"] = os.path.join(tmp, "documents")
+
+    from sections import load_section_index
+    from tables import load_tables
+    from ratios import LINE_ITEMS, compute_ratios, ratio_context
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+    from benchmarks.bench_passage_retrieval import _token_counter
+
+    count_tokens, counter_name = _token_counter()
+    path = write_synthetic_pdf(os.path.join(tmp, "filing.pdf"), args.pages, sections=True)
+    sections = load_section_index(path)
+    load_tables(path, sha256=sections.document.sha256)
+
+    start = time.perf_counter()
+    block = ratio_context(path, sha256=sections.document.sha256)  # at extraction
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    ratio_context(path, sha256=sections.document.sha256)  # at crew kickoff
+    cached = time.perf_counter() - start
+    pages_tokens = sum(count_tokens(sections.read(name, max_pages=10_000))
+                       for name in ("balance_sheet", "income_statement"))
+    print(f"tokens: {counter_name}")
+    print(f"ratio block: {count_tokens(block):,} tokens, built in {build * 1000:.1f} ms from the tables "
+          f"at extraction, {cached * 1000:.2f} ms from the cache at kickoff")
+    print(f"balance sheet + income statement pages: {pages_tokens:,} tokens\n")
+
+    rng = np.random.default_rng(7)
+    items = pd.DataFrame(rng.uniform(1e6, 1e9, (len(LINE_ITEMS), args.periods)),
+                         index=list(LINE_ITEMS), columns=[f"Q{i}" for i in range(args.periods)])
+    timings = {}
+    for label, fn in (("numpy bulk", compute_ratios), ("per-period loop", per_period_ratios)):
+        start = time.perf_counter()
+        fn(items)
+        timings[label] = time.perf_counter() - start
+    for label, seconds in timings.items():
+        print(f"{label:<16} {args.periods} periods: {seconds * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: inline vs compressed out-of-row analysis results.
+
+Builds a database in the pre-migration layout (result/error Text columns
+inline in `analyses`), measures file size and history/scan query times,
+then runs init_db's migration to compressed analysis_contents rows plus
+VACUUM and measures again.
+
+Run from the repository root:
+    python -m benchmarks.bench_result_storage --rows 20000
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import text
+
+from database import init_db, make_engine
+
+LEGACY_SCHEMA = """
+CREATE TABLE analyses (
+    id VARCHAR PRIMARY KEY, filename VARCHAR NOT NULL, query TEXT NOT NULL,
+    status VARCHAR, result TEXT, error TEXT, created_at DATETIME,
+    completed_at DATETIME, duration_seconds FLOAT
+)
+"""
+
+_SECTIONS = ["Executive Summary", "Key Financial Metrics", "Trend Analysis", "Risk Factors",
+             "Investment Considerations"]
+_SENTENCES = [
+    "Revenue increased {p}% year over year to ${n} million, driven by services growth.",
+    "Operating margin contracted by {p} basis points due to higher input costs.",
+    "Net debt stood at ${n} million with a leverage ratio of {p}x EBITDA.",
+    "Management flagged covenant headroom as a key liquidity consideration.",
+    "Free cash flow of ${n} million covered dividends {p} times.",
+]
+
+
+def synthetic_result(rng: random.Random) -> str:
+    parts = []
+    for section in _SECTIONS:
+        parts.append(f"## {section}\n")
+        for _ in range(rng.randint(4, 8)):
+            parts.append(rng.choice(_SENTENCES).format(p=rng.randint(1, 40), n=rng.randint(100, 9000)) + "\n")
+    return "".join(parts)
+
+
+def build_legacy_db(path: str, rows: int):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA)
+    start = datetime.datetime(2024, 1, 1)
+    conn.executemany(
+        "INSERT INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (str(uuid.uuid4()), f"report_{i}.pdf", "Analyze revenue trends and risks", "completed",
+             synthetic_result(rng), None, (start + datetime.timedelta(minutes=i)).isoformat(" "),
+             None, rng.uniform(10, 120))
+            for i in range(rows)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def storage_mb(path: str) -> dict:
+    """File size, split into row storage and the (contentless) FTS index."""
+    sizes = {"db size MB": os.path.getsize(path) / 1e6}
+    conn = sqlite3.connect(path)
+    try:
+        pages = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+    except sqlite3.OperationalError:
+        pages = []  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+    finally:
+        conn.close()
+    if pages:
+        fts = sum(size for name, size in pages if name.startswith("analyses_fts"))
+        sizes["rows MB"] = (sum(size for _, size in pages) - fts) / 1e6
+        sizes["fts index MB"] = fts / 1e6
+    return sizes
+
+
+def time_queries(path: str, repeat: int = 20) -> dict:
+    conn = sqlite3.connect(path)
+    queries = {
+        "history page ms": "SELECT id, filename, query, status, created_at, duration_seconds "
+                           "FROM analyses ORDER BY created_at DESC LIMIT 20",
+        "full scan ms": "SELECT COUNT(*) FROM analyses WHERE query LIKE '%liquidity%'",
+    }
+    timings = {}
+    for label, sql in queries.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql).fetchall()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best * 1000
+    conn.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "analyses.db")
+        build_legacy_db(path, args.rows)
+        before = {**storage_mb(path), **time_queries(path)}
+
+        engine = make_engine(f"sqlite:///{path}", high_concurrency=False)
+        start = time.perf_counter()
+        init_db(engine)
+        migration_seconds = time.perf_counter() - start
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+        engine.dispose()
+        after = {**storage_mb(path), **time_queries(path)}
+
+    print(f"rows: {args.rows}  migration: {migration_seconds:.1f} s")
+    for label in after:
+        print(f"{label:<16} inline: {before.get(label, 0.0):>9.2f}   compressed out-of-row: {after[label]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
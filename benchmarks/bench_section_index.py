@@ -0,0 +1,78 @@
+"""
+Benchmark: section index detection and section reads vs the full text.
+
+For synthetic 10-K style filings with and without a PDF outline, reports the
+one-off detection cost (outline or heading scan), the name -> page range
+lookup time, the cost of a warm tool call's lookup (file hash and index
+load included), and how many tokens reading one statement hands the LLM compared
+with the whole document. Detected ranges are checked against where the
+generator placed each section.
+
+Run from the repository root:
+    python -m benchmarks.bench_section_index --pages 50,200,600
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+NAMES = ["income statement", "balance sheet", "cash flow", "MD&A", "risk factors"]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", default="50,200,600", help="comma-separated page counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    # Must be set before cache is imported, to keep benchmark entries out of the real cache.
+    os.environ["DOCUMENT_CACHE_DIR"] = os.path.join(tmp, "documents")
+
+    from extraction import load_document
+    from sections import SectionIndex, detect_sections, load_section_index
+    from benchmarks.synthetic_pdf import write_synthetic_pdf, section_starts
+    from benchmarks.bench_passage_retrieval import _token_counter
+
+    count_tokens, counter_name = _token_counter()
+    print(f"tokens: {counter_name}, averaged over {len(NAMES)} sections\n")
+    print(f"{'pages':>6} {'source':>9} {'ok':>3} {'detect ms':>10} {'lookup us':>10} {'tool us':>8} "
+          f"{'full tok':>10} {'section tok':>12} {'saved':>7}")
+
+    for pages in (int(p) for p in args.pages.split(",")):
+        for outline in (True, False):
+            path = write_synthetic_pdf(os.path.join(tmp, f"filing_{pages}_{outline}.pdf"), pages,
+                                       sections=True, outline=outline)
+            document = load_document(path)
+            detect = _best(lambda: detect_sections(path, document), args.repeat)
+
+            data = detect_sections(path, document)
+            index = SectionIndex(document, data)
+            ok = all(data["sections"].get(name, {}).get("start") == start
+                     for name, start in section_starts(pages).items())
+
+            lookup = statistics.mean(_best(lambda: index.resolve(name), args.repeat) for name in NAMES)
+            load_section_index(path)  # first tool call: hashes the PDF and loads the index
+            tool = statistics.mean(_best(lambda: load_section_index(path).resolve(name), args.repeat)
+                                   for name in NAMES)
+            full_tokens = count_tokens(document.text)
+            section_tokens = statistics.mean(count_tokens(index.read(name)) for name in NAMES)
+
+            print(f"{pages:>6} {data['source']:>9} {'yes' if ok else 'NO':>3} {detect * 1000:>10.2f} "
+                  f"{lookup * 1e6:>10.2f} {tool * 1e6:>8.1f} {full_tokens:>10,} {section_tokens:>12,.0f} "
+                  f"{1 - section_tokens / full_tokens:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: concurrent writers against the analyses table.
+
+Simulates Celery workers and API threads: each writer process inserts
+records and walks them through queued -> processing -> completed, while a
+reader process runs /history-style queries. Runs once with the default
+engine and once with SQLITE_HIGH_CONCURRENCY, reporting throughput,
+commit latency and "database is locked" failures.
+
+Run from the repository root:
+    python -m benchmarks.bench_sqlite_writers --writers 8 --records 200
+"""
+
+import argparse
+import datetime
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import AnalysisRecord, init_db, make_engine
+
+
+def _writer(url, high_concurrency, records, results):
+    engine = make_engine(url, high_concurrency)
+    Session = sessionmaker(bind=engine)
+    latencies, errors = [], 0
+    result_text = "x" * 4000  # a typical few-KB analysis
+
+    for _ in range(records):
+        db = Session()
+        try:
+            record = AnalysisRecord(id=str(uuid.uuid4()), filename="report.pdf", query="q", status="queued")
+            for step in ("queued", "processing", "completed"):
+                record.status = step
+                if step == "queued":
+                    db.add(record)
+                if step == "completed":
+                    record.result = result_text
+                    record.completed_at = datetime.datetime.utcnow()
+                start = time.perf_counter()
+                db.commit()
+                latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors += 1
+            db.rollback()
+        finally:
+            db.close()
+
+    results.put((latencies, errors))
+
+
+def _reader(url, high_concurrency, stop, results):
+    engine = make_engine(url, high_concurrency)
+    Session = sessionmaker(bind=engine)
+    latencies, errors = [], 0
+    while not stop.is_set():
+        db = Session()
+        start = time.perf_counter()
+        try:
+            (db.query(AnalysisRecord.id, AnalysisRecord.created_at)
+             .filter(AnalysisRecord.status == "completed")
+             .order_by(AnalysisRecord.created_at.desc())
+             .limit(20).all())
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors += 1
+        finally:
+            db.close()
+    results.put((latencies, errors))
+
+
+def _pct(values, pct):
+    if not values:
+        return float("nan")
+    return sorted(values)[min(len(values) - 1, int(len(values) * pct))] * 1000
+
+
+def run(high_concurrency, writers, records):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        init_db(make_engine(url, high_concurrency))
+
+        write_results, read_results = multiprocessing.Queue(), multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        reader = multiprocessing.Process(target=_reader, args=(url, high_concurrency, stop, read_results))
+        procs = [multiprocessing.Process(target=_writer, args=(url, high_concurrency, records, write_results))
+                 for _ in range(writers)]
+
+        start = time.perf_counter()
+        reader.start()
+        for p in procs:
+            p.start()
+        outcomes = [write_results.get() for _ in procs]
+        elapsed = time.perf_counter() - start
+        stop.set()
+        read_latencies, read_errors = read_results.get()
+        for p in procs + [reader]:
+            p.join()
+
+    commit_latencies = [lat for lats, _ in outcomes for lat in lats]
+    write_errors = sum(err for _, err in outcomes)
+    completed = writers * records - write_errors
+    return {
+        "records/s": completed / elapsed,
+        "commit p50 ms": statistics.median(commit_latencies) * 1000 if commit_latencies else float("nan"),
+        "commit p99 ms": _pct(commit_latencies, 0.99),
+        "read p99 ms": _pct(read_latencies, 0.99),
+        "locked errors": write_errors + read_errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--records", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"writers: {args.writers}  records per writer: {args.records}")
+    for label, high in (("default", False), ("high-concurrency", True)):
+        stats = run(high, args.writers, args.records)
+        print(f"{label:<17}" + "  ".join(f"{k}: {v:.1f}" if isinstance(v, float) else f"{k}: {v}"
+                                         for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
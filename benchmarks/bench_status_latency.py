@@ -0,0 +1,158 @@
+"""
+Benchmark: GET /status latency while other processes write heavily.
+
+Writer processes continuously insert analyses and walk them through
+queued -> processing -> completed (like busy Celery workers), while many
+concurrent clients poll /status through the ASGI app. Runs once against the
+previous implementation (sync Session inside `async def`, mounted on a
+scratch route) and once against the asyncio endpoint in main.py, reporting
+latency percentiles and throughput.
+
+Keep --clients below the sync pool size (15 connections): beyond that the
+sync path checks out connections on the event loop thread itself and stalls
+until the pool timeout.
+
+Run from the repository root:
+    python -m benchmarks.bench_status_latency --writers 4 --clients 12 --seconds 10
+"""
+
+import argparse
+import asyncio
+import datetime
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+
+def _writer(url, stop):
+    from database import AnalysisRecord, make_engine
+
+    Session = sessionmaker(bind=make_engine(url))
+    result_text = "x" * 4000  # a typical few-KB analysis
+    while not stop.is_set():
+        db = Session()
+        try:
+            record = AnalysisRecord(id=str(uuid.uuid4()), filename="report.pdf", query="q", status="queued")
+            db.add(record)
+            db.commit()
+            record.status = "processing"
+            db.commit()
+            record.status = "completed"
+            record.result = result_text
+            record.completed_at = datetime.datetime.utcnow()
+            db.commit()
+        except OperationalError:
+            db.rollback()
+        finally:
+            db.close()
+
+
+def _build_app():
+    from fastapi import Depends, FastAPI, HTTPException
+    from sqlalchemy.orm import Session, joinedload, undefer_group
+
+    import main
+    from database import AnalysisRecord, get_db
+
+    app = FastAPI()
+
+    @app.get("/sync/status/{task_id}")
+    async def sync_status(task_id: str, db: Session = Depends(get_db)):
+        record = (
+            db.query(AnalysisRecord)
+            .options(undefer_group("payload"), joinedload(AnalysisRecord.content))
+            .filter(AnalysisRecord.id == task_id)
+            .first()
+        )
+        if not record:
+            raise HTTPException(status_code=404)
+        return {"task_id": task_id, "status": record.status, "analysis": record.result}
+
+    app.get("/async/status/{task_id}")(main.get_task_status)
+    return app
+
+
+async def _poll(app, prefix, task_ids, clients, seconds):
+    import httpx
+
+    from database import dispose_async_engine
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(http):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await http.get(f"{prefix}/status/{random.choice(task_ids)}")
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+    await dispose_async_engine()  # pooled connections belong to this event loop
+    return latencies, errors
+
+
+def _report(label, latencies, errors, seconds):
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1] if ordered else 0.0
+    print(
+        f"{label:<6} requests/s: {len(latencies) / seconds:>7.1f}   "
+        f"p50: {statistics.median(ordered) * 1000:>7.1f} ms   "
+        f"p99: {p99 * 1000:>7.1f} ms   max: {ordered[-1] * 1000:>7.1f} ms   errors: {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'analyses.db')}"
+        # Must be set before database/main are imported: both bind at import time.
+        os.environ["DATABASE_URL"] = url
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+
+        from database import AnalysisRecord, SessionLocal
+
+        app = _build_app()
+
+        db = SessionLocal()
+        task_ids = [str(uuid.uuid4()) for _ in range(200)]
+        for task_id in task_ids:
+            record = AnalysisRecord(id=task_id, filename="report.pdf", query="q", status="completed",
+                                    completed_at=datetime.datetime.utcnow(), duration_seconds=1.0)
+            record.result = "x" * 4000
+            db.add(record)
+        db.commit()
+        db.close()
+
+        for label in ("sync", "async"):
+            stop = multiprocessing.Event()
+            writers = [multiprocessing.Process(target=_writer, args=(url, stop)) for _ in range(args.writers)]
+            for p in writers:
+                p.start()
+            try:
+                latencies, errors = asyncio.run(_poll(app, f"/{label}", task_ids, args.clients, args.seconds))
+            finally:
+                stop.set()
+                for p in writers:
+                    p.join()
+            _report(label, latencies, errors, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
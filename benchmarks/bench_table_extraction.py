@@ -0,0 +1,62 @@
+"""
+Benchmark: statement tables as CSV vs the statement pages as text.
+
+For synthetic filings, parses the income statement, balance sheet and cash
+flow statement into DataFrames and reports the parse time, whether every
+line item was recovered with signed values, and the tokens the table reader
+tool hands the agent compared with reading the same pages as text.
+
+Run from the repository root:
+    python -m benchmarks.bench_table_extraction --pages 50,200,600
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", default="50,200,600", help="comma-separated page counts")
+    parser.add_argument("--lines-per-page", type=int, default=60)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    # Must be set before cache is imported, to keep benchmark entries out of the real cache.
+    os.environ["DOCUMENT_CACHE_DIR"] = os.path.join(tmp, "documents")
+
+    from sections import load_section_index
+    from tables import extract_tables
+    from benchmarks.synthetic_pdf import write_synthetic_pdf
+    from benchmarks.bench_passage_retrieval import _token_counter
+
+    count_tokens, counter_name = _token_counter()
+    print(f"tokens: {counter_name}\n")
+    print(f"{'pages':>6} {'statement':>17} {'rows':>6} {'ok':>3} {'parse ms':>9} "
+          f"{'text tok':>9} {'csv tok':>8} {'saved':>7}")
+
+    for pages in (int(p) for p in args.pages.split(",")):
+        path = write_synthetic_pdf(os.path.join(tmp, f"filing_{pages}.pdf"), pages,
+                                   lines_per_page=args.lines_per_page, sections=True)
+        sections = load_section_index(path)
+
+        start = time.perf_counter()
+        tables = extract_tables(sections)
+        parse = time.perf_counter() - start
+
+        for name, table in tables.items():
+            frame = table.frame()
+            section = sections.sections[name]
+            expected_rows = (section["end"] - section["start"] + 1) * args.lines_per_page
+            # The generator writes "current (prior)": every prior-year amount is negative.
+            ok = len(frame) == expected_rows and (frame["2024"] > 0).all() and (frame["2023"] < 0).all()
+            text_tokens = count_tokens(sections.read(name, max_pages=10_000))
+            csv_tokens = count_tokens(table.for_agent())
+            print(f"{pages:>6} {name:>17} {len(frame):>6} {'yes' if ok else 'NO':>3} "
+                  f"{parse * 1000 / len(tables):>9.2f} {text_tokens:>9,} {csv_tokens:>8,} "
+                  f"{1 - csv_tokens / text_tokens:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
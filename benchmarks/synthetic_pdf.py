@@ -0,0 +1,132 @@
+"""
+Synthetic financial PDF generator used by the benchmarks.
+Writes a plain text-only PDF by hand so no extra dependency is needed.
+"""
+
+import random
+
+_LINE_ITEMS = [
+    "Total revenue", "Cost of revenue", "Gross profit", "Operating expenses",
+    "Operating income", "Interest expense", "Net income", "Total current assets",
+    "Total current liabilities", "Long-term debt", "Shareholders' equity",
+    "Net cash provided by operating activities", "Capital expenditures",
+]
+
+# Sections of a 10-K style filing, in document order.
+SECTION_HEADINGS = [
+    ("risk_factors", "Item 1A. Risk Factors"),
+    ("mdna", "Item 7. Management's Discussion and Analysis of Financial Condition and Results of Operations"),
+    ("income_statement", "Consolidated Statements of Operations"),
+    ("balance_sheet", "Consolidated Balance Sheets"),
+    ("cash_flow", "Consolidated Statements of Cash Flows"),
+]
+
+# Sections laid out as tables: a unit line and a period header follow the title.
+STATEMENT_SECTIONS = ("income_statement", "balance_sheet", "cash_flow")
+
+
+def section_starts(pages: int) -> dict:
+    """Zero-based first page of each section; page 0 is the table of contents."""
+    step = max(1, (pages - 1) // len(SECTION_HEADINGS))
+    return {name: min(1 + i * step, pages - 1) for i, (name, _) in enumerate(SECTION_HEADINGS)}
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+# Legal banner and footer repeated on every page of many annual reports.
+FOOTER_LINES = [
+    "This report contains forward-looking statements that involve risks and uncertainties; see Item 1A.",
+    "ACME Corp  |  2024 Form 10-K  |  Confidential treatment requested for portions marked [*]",
+]
+
+
+def _page_stream(page_number: int, lines_per_page: int, rng: random.Random, headings=(),
+                 footer: bool = False) -> bytes:
+    ops = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+    ops.append(f"(ACME Corp - Annual Report 2024    Page {page_number}) Tj T*")
+    for heading in headings:
+        ops.append(f"({_escape(heading)}) Tj T*")
+    for i in range(lines_per_page):
+        item = rng.choice(_LINE_ITEMS)
+        current, prior = rng.randint(1_000, 99_999), rng.randint(1_000, 99_999)
+        ops.append(f"({_escape(item)}  {current:,}  ({prior:,})) Tj T*")
+        if i % 5 == 4:
+            # Literal newlines inside the string yield the blank-line runs
+            # real filings produce between statement blocks.
+            ops.append("(\\n\\n\\n\\n) Tj T*")
+    if footer:
+        for line in FOOTER_LINES:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append(f"(- {page_number} -) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_synthetic_pdf(path: str, pages: int, lines_per_page: int = 60, seed: int = 7,
+                        sections: bool = False, outline: bool = False, footer: bool = False) -> str:
+    """
+    Write a text-only PDF with `pages` pages of financial line items.
+
+    With `sections`, page 1 is a table of contents and each entry of
+    SECTION_HEADINGS starts with a heading line at section_starts(pages)
+    (statements also get unit and period lines); `outline` also adds a
+    bookmark per section. `footer` ends every page with a legal banner and
+    a page number, on top of the running header every page has.
+    """
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    headings = {}
+    if sections:
+        starts = section_starts(pages)
+        headings[0] = ["Table of Contents"] + [f"{title}    {starts[name] + 1}" for name, title in SECTION_HEADINGS]
+        for name, title in SECTION_HEADINGS:
+            headings.setdefault(starts[name], []).append(title)
+            if name in STATEMENT_SECTIONS:
+                headings[starts[name]] += ["(In thousands, except per share data)", "Year ended December 31, 2024 2023"]
+    kids = []
+    for n in range(1, pages + 1):
+        stream = _page_stream(n, lines_per_page, rng, headings.get(n - 1, ()), footer)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), pages
+    )
+    if sections and outline:
+        root = len(objects) + 1
+        first = root + 1
+        last = root + len(SECTION_HEADINGS)
+        objects[0] = b"<< /Type /Catalog /Pages 2 0 R /Outlines %d 0 R >>" % root
+        objects.append(b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+            first, last, len(SECTION_HEADINGS)))
+        starts = section_starts(pages)
+        for i, (name, title) in enumerate(SECTION_HEADINGS):
+            number = first + i
+            links = (b" /Prev %d 0 R" % (number - 1) if number > first else b"") + \
+                    (b" /Next %d 0 R" % (number + 1) if number < last else b"")
+            objects.append(b"<< /Title (%s) /Parent %d 0 R%s /Dest [%d 0 R /Fit] >>" % (
+                _escape(title).encode("latin-1"), root, links, kids[starts[name]]))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
@@ -0,0 +1,297 @@
+"""
+Disk-backed caches shared by the API process and Celery workers.
+
+- DocumentCache: extracted documents keyed by the SHA-256 of the uploaded
+  PDF bytes, so the same report is only ever parsed once.
+- LLMResponseCache: LLM completions in SQLite keyed by model, prompt,
+  prompt-template version and the hash of the document being analyzed, so
+  identical re-runs skip the provider entirely.
+- MemoryLRU: small per-process LRU for deserialized per-document indexes,
+  so repeated tool calls skip the disk cache too.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterable, Optional
+
+DOCUMENT_CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", "cache/documents")
+DOCUMENT_CACHE_MAX_MB = int(os.getenv("DOCUMENT_CACHE_MAX_MB", "512"))
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.db")
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "24"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class MemoryLRU:
+    """Thread-safe in-memory LRU mapping, least recently used dropped first."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Hashes of recently seen files keyed by (path, size, mtime), so tools called
+# repeatedly on the same PDF stat it instead of re-reading every byte.
+_file_hashes = MemoryLRU(256)
+
+
+def sha256_file(path: str) -> str:
+    """Hash a file in fixed-size chunks without loading it into memory."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    cached = _file_hashes.get(key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    _file_hashes.put(key, digest.hexdigest())
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """
+    Size-bounded LRU cache of JSON payloads stored one file per entry.
+
+    Recency is tracked through file modification times (refreshed on every
+    hit), so the LRU order survives restarts and is shared by every process
+    pointing at the same directory.
+    """
+
+    def __init__(self, directory: str = DOCUMENT_CACHE_DIR, max_bytes: int = DOCUMENT_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached payload for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mark as most recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        """Store `value` under `key`, then evict least recently used entries."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, separators=(",", ":"))
+        os.replace(tmp_path, path)  # atomic, so readers never see a partial entry
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # removed by another process
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus current on-disk usage."""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def hash_files(paths: Iterable[str]) -> str:
+    """Short content hash over several source files (e.g. prompt definitions)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+_active_document = contextvars.ContextVar("active_document_hash", default=None)
+
+
+@contextmanager
+def document_scope(sha256: Optional[str]):
+    """Attribute LLM calls made in this context (thread) to the document with this content hash."""
+    token = _active_document.set(sha256)
+    try:
+        yield sha256
+    finally:
+        _active_document.reset(token)
+
+
+def active_document() -> Optional[str]:
+    """Content hash of the document being analyzed in the current context, if any."""
+    return _active_document.get()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed cache of LLM completions with TTL and LRU eviction.
+
+    Each thread gets its own connection; WAL mode lets API threads and
+    Celery worker processes read and write the same file concurrently.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_HOURS * 3600,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """Stable hash over everything that influences the completion."""
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or older than the TTL."""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or now - row[1] > self.ttl_seconds:
+            if row is not None:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                conn.commit()
+            with self._lock:
+                self.misses += 1
+            return None
+
+        conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        with self._lock:
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a response, then trim expired and least recently used entries."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, last_used_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, model, response, now, now),
+        )
+        conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            "  SELECT key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_entries,),
+        )
+        conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the number of stored entries."""
+        entries = self._conn().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": entries,
+                    "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds}
+
+
+# Shared extracted-text cache used by the document reader tool.
+document_cache = DocumentCache()
@@ -0,0 +1,125 @@
+"""
+Per-process pool of pre-built, isolated crews.
+
+The agents and tasks in agents.py / task.py are module-level templates. Running
+them directly would share one mutable agent (executor, tool cache, step
+callback, tool results) between every analysis in the process. Instead, each
+pooled crew owns its own copies, built once at API startup or Celery
+worker_process_init, handed to one analysis at a time and reset afterwards.
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from crewai import Crew, Process
+
+from agents import financial_analyst
+from task import analysis_task
+from notifier import report_step
+
+CREW_POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", "2"))
+
+
+def build_analysis_crew() -> Crew:
+    """A crew with private copies of the analyst agent and the analysis task."""
+    agent = financial_analyst.copy()
+    task = analysis_task.copy(agents=[agent], task_mapping={})
+    return Crew(
+        agents=[agent],
+        tasks=[task],
+        process=Process.sequential,
+        step_callback=report_step,
+    )
+
+
+def reset_crew(crew: Crew):
+    """Clear per-run state so the next analysis starts from a clean crew."""
+    for task in crew.tasks:
+        task.output = None
+        task.processed_by_agents = set()
+        task.retry_count = 0
+        task.used_tools = 0
+        task.tools_errors = 0
+        task.delegations = 0
+        task.start_time = None
+        task.end_time = None
+    for agent in crew.agents:
+        agent.tools_results = []
+    crew.usage_metrics = None
+
+
+class CrewPool:
+    """
+    Fixed number of idle crews, each lent to a single analysis at a time.
+
+    When every crew is in use, an extra one is built on demand (counted as a
+    cold build) instead of making the caller wait. A crew whose run raised is
+    discarded rather than reused.
+    """
+
+    def __init__(self, factory: Callable[[], Crew] = build_analysis_crew, size: int = CREW_POOL_SIZE):
+        self.factory = factory
+        self.size = size
+        self.warm_builds = 0
+        self.cold_builds = 0
+        self.build_seconds_total = 0.0
+        self.last_build_seconds = None
+        self.acquisitions = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _build(self, cold: bool) -> Crew:
+        start = time.perf_counter()
+        crew = self.factory()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if cold:
+                self.cold_builds += 1
+            else:
+                self.warm_builds += 1
+            self.build_seconds_total += elapsed
+            self.last_build_seconds = elapsed
+        return crew
+
+    def warm(self):
+        """Build crews until `size` are idle. Called once per process at startup."""
+        while self._idle.qsize() < self.size:
+            self._idle.put(self._build(cold=False))
+
+    @contextmanager
+    def crew(self):
+        """Borrow a crew for one analysis; it is reset and returned afterwards."""
+        try:
+            crew = self._idle.get_nowait()
+        except queue.Empty:
+            crew = self._build(cold=True)
+        with self._lock:
+            self.acquisitions += 1
+
+        yield crew
+
+        # Only reached when the run succeeded.
+        reset_crew(crew)
+        if self._idle.qsize() < self.size:
+            self._idle.put(crew)
+
+    def stats(self) -> dict:
+        """Pool occupancy and crew construction cost for this process."""
+        with self._lock:
+            builds = self.warm_builds + self.cold_builds
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "acquisitions": self.acquisitions,
+                "warm_builds": self.warm_builds,
+                "cold_builds": self.cold_builds,
+                "avg_build_seconds": round(self.build_seconds_total / builds, 4) if builds else None,
+                "last_build_seconds": round(self.last_build_seconds, 4) if builds else None,
+            }
+
+
+crew_pool = CrewPool()
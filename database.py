@@ -3,15 +3,110 @@ Database Integration using SQLAlchemy + SQLite.
 Stores every analysis request and result for future retrieval.
 """
 
+import os
+import re
+import zlib
+import sqlite3
 import datetime
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Float
+import hashlib
+from typing import NamedTuple
+from sqlalchemy import (
+    create_engine, event, Column, String, Text, DateTime, Float, Integer, LargeBinary, ForeignKey, Index,
+    inspect, select, text,
+)
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred, relationship, column_property
 
-DATABASE_URL = "sqlite:///./analyses.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./analyses.db")
+# Same database through an asyncio driver, used by the read-mostly API
+# endpoints so queries never block the event loop. Celery workers and the
+# analysis endpoints keep the sync engine. Derived automatically for SQLite;
+# other databases need it set explicitly (e.g. postgresql+asyncpg://...).
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1) if DATABASE_URL.startswith("sqlite") else None
+)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Opt-in tuning for many concurrent writers (API threads + Celery workers):
+# WAL journaling lets readers proceed during writes, and the busy timeout makes
+# writers wait for the lock instead of failing with "database is locked".
+SQLITE_HIGH_CONCURRENCY = os.getenv("SQLITE_HIGH_CONCURRENCY", "false").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+
+SQLITE_HIGH_CONCURRENCY_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",      # durable under WAL except on power loss
+    "PRAGMA cache_size=-65536",       # 64 MB page cache per connection
+    "PRAGMA mmap_size=268435456",     # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+)
+
+
+def _apply_high_concurrency_pragmas(sync_engine):
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_HIGH_CONCURRENCY_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def make_engine(url: str = DATABASE_URL, high_concurrency: bool = SQLITE_HIGH_CONCURRENCY):
+    """Create the SQLAlchemy engine, applying the high-concurrency pragmas if enabled."""
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+
+    connect_args = {"check_same_thread": False}
+    if high_concurrency:
+        connect_args["timeout"] = SQLITE_BUSY_TIMEOUT_MS / 1000
+
+    new_engine = create_engine(url, connect_args=connect_args)
+    if high_concurrency:
+        _apply_high_concurrency_pragmas(new_engine)
+    return new_engine
+
+
+def make_async_engine(url: str, high_concurrency: bool = SQLITE_HIGH_CONCURRENCY):
+    """Create the asyncio engine, with the same SQLite tuning as make_engine."""
+    if not url.startswith("sqlite"):
+        return create_async_engine(url)
+
+    connect_args = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000} if high_concurrency else {}
+    new_engine = create_async_engine(url, connect_args=connect_args)
+    if high_concurrency:
+        _apply_high_concurrency_pragmas(new_engine.sync_engine)
+    return new_engine
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Created on first use, so workers and scripts that only need the sync engine
+# import this module without an asyncio driver or ASYNC_DATABASE_URL.
+_async_engine = None
+# expire_on_commit=False: attributes stay readable after commit without
+# another (implicit, and under asyncio forbidden) round trip.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def get_async_engine():
+    """The asyncio engine, created on first call."""
+    global _async_engine
+    if _async_engine is None:
+        if ASYNC_DATABASE_URL is None:
+            raise RuntimeError(
+                f"ASYNC_DATABASE_URL must be set to an asyncio driver URL for {DATABASE_URL.split(':', 1)[0]} "
+                "(e.g. postgresql+asyncpg://...); it is only derived automatically for SQLite"
+            )
+        _async_engine = make_async_engine(ASYNC_DATABASE_URL)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """Close the asyncio engine's pooled connections, if it was ever created."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
 Base = declarative_base()
 
 
@@ -20,19 +115,550 @@ class AnalysisRecord(Base):
     __tablename__ = "analyses"
 
     id = Column(String, primary_key=True, index=True)
-    filename = Column(String, nullable=False)
+    filename = Column(String, nullable=False, index=True)
     query = Column(Text, nullable=False)
-    status = Column(String, default="queued")       # queued | processing | completed | failed
-    result = Column(Text, nullable=True)
-    error = Column(Text, nullable=True)
+    # active_history: load the previous status before it changes, even when the
+    # instance was expired by a commit, so the counter update knows what to decrement.
+    status = column_property(Column(String, default="queued"), active_history=True)  # queued | processing | completed | failed
+    progress = Column(String, nullable=True)         # latest intermediate step while processing
+    snippet = Column(String, nullable=True)          # short plain-text preview of result
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
-    duration_seconds = Column(Float, nullable=True)
+    duration_seconds = Column(Float, nullable=True, index=True)
+    # Loaded only when accessed, or via undefer_group("payload") by the
+    # single-analysis endpoints.
+    stage_timings = deferred(Column(Text, nullable=True), group="payload")  # JSON, see timing.StageTimer
+    content_hash = Column(String, nullable=True)    # SHA-256 of the uploaded PDF
+    query_hash = Column(String, nullable=True)      # SHA-256 of the normalized query
+
+    __table_args__ = (
+        Index("ix_analyses_content_query", "content_hash", "query_hash"),
+        # Keyset pagination orders by (created_at, id); the status variant also
+        # serves status-only filters (leftmost prefix).
+        Index("ix_analyses_created_at_id", "created_at", "id"),
+        Index("ix_analyses_status_created_at_id", "status", "created_at", "id"),
+    )
+
+    # Result text and error tracebacks live compressed in analysis_contents and
+    # are loaded lazily, only when a single analysis is requested.
+    content = relationship(
+        "AnalysisContent", uselist=False, lazy="select",
+        back_populates="record", cascade="all, delete-orphan",
+    )
+
+    def _content(self) -> "AnalysisContent":
+        if self.content is None:
+            self.content = AnalysisContent()
+        return self.content
+
+    @property
+    def result(self):
+        return self.content.result if self.content else None
+
+    @result.setter
+    def result(self, value):
+        self._content().result = value
+        self.snippet = make_snippet(value) if value else None
+
+    @property
+    def error(self):
+        return self.content.error if self.content else None
+
+    @error.setter
+    def error(self, value):
+        self._content().error = value
+
+
+RESULT_CODEC = "zlib"
+_ZLIB_LEVEL = 6
+
+
+def _compress(value):
+    if value is None:
+        return None
+    return zlib.compress(value.encode("utf-8"), _ZLIB_LEVEL)
+
+
+def _decompress(codec: str, data):
+    if data is None:
+        return None
+    if codec != "zlib":
+        raise ValueError(f"Unknown analysis content codec: {codec}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+class AnalysisContent(Base):
+    """Compressed result and error text for one analysis, stored out of the main row."""
+    __tablename__ = "analysis_contents"
+
+    analysis_id = Column(String, ForeignKey("analyses.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False, default=RESULT_CODEC)
+    result_data = Column(LargeBinary, nullable=True)
+    error_data = Column(LargeBinary, nullable=True)
+
+    record = relationship("AnalysisRecord", back_populates="content")
+
+    @property
+    def result(self):
+        return _decompress(self.codec, self.result_data)
+
+    @result.setter
+    def result(self, value):
+        self.codec = RESULT_CODEC
+        self.result_data = _compress(value)
+
+    @property
+    def error(self):
+        return _decompress(self.codec, self.error_data)
+
+    @error.setter
+    def error(self, value):
+        self.codec = RESULT_CODEC
+        self.error_data = _compress(value)
+
+
+class AnalysisCount(Base):
+    """Row count per status, maintained on every insert, delete and status change."""
+    __tablename__ = "analysis_counts"
+
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AnalysisCheckpoint(Base):
+    """Output of one finished pipeline stage, so a retried or redelivered job resumes from it."""
+    __tablename__ = "analysis_checkpoints"
+
+    analysis_id = Column(String, ForeignKey("analyses.id", ondelete="CASCADE"), primary_key=True)
+    stage = Column(String, primary_key=True)
+    codec = Column(String, nullable=False, default=RESULT_CODEC)
+    data = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+@event.listens_for(AnalysisRecord, "after_delete")
+def _checkpoints_delete(mapper, connection, record):
+    connection.execute(
+        text("DELETE FROM analysis_checkpoints WHERE analysis_id = :id"), {"id": record.id}
+    )
+
+
+SNIPPET_LENGTH = 240
+
+_MARKDOWN_NOISE = re.compile(r"[#*_`>|]+")
+
+
+def make_snippet(result: str, length: int = SNIPPET_LENGTH) -> str:
+    """Plain-text preview of an analysis: markdown markers stripped, whitespace collapsed."""
+    flat = " ".join(_MARKDOWN_NOISE.sub(" ", result).split())
+    return flat if len(flat) <= length else flat[:length - 1].rstrip() + "…"
+
+
+def _bump_count(connection, status: str, delta: int):
+    updated = connection.execute(
+        text("UPDATE analysis_counts SET count = count + :delta WHERE status = :status"),
+        {"delta": delta, "status": status},
+    )
+    if updated.rowcount == 0:
+        connection.execute(
+            text("INSERT INTO analysis_counts (status, count) VALUES (:status, :delta)"),
+            {"delta": delta, "status": status},
+        )
+
+
+@event.listens_for(AnalysisRecord, "after_insert")
+def _count_insert(mapper, connection, record):
+    _bump_count(connection, record.status, 1)
+
+
+@event.listens_for(AnalysisRecord, "after_delete")
+def _count_delete(mapper, connection, record):
+    _bump_count(connection, record.status, -1)
+
+
+@event.listens_for(AnalysisRecord, "after_update")
+def _count_status_change(mapper, connection, record):
+    history = inspect(record).attrs.status.history
+    if history.deleted and history.added and history.deleted[0] != history.added[0]:
+        _bump_count(connection, history.deleted[0], -1)
+        _bump_count(connection, history.added[0], 1)
+
+
+async def count_analyses(db, status: str = None) -> int:
+    """Total number of analyses (optionally for one status) from the maintained counters."""
+    query = select(AnalysisCount.count)
+    if status:
+        query = query.where(AnalysisCount.status == status)
+    return sum((await db.execute(query)).scalars().all())
+
+
+# ─────────────────────────────────────────
+# Full-text search (SQLite FTS5)
+# ─────────────────────────────────────────
+
+# analyses_fts is contentless: it holds only the inverted index of query and
+# (decompressed) result, never a second copy of the text, which stays
+# compressed in analysis_contents. Its rowid is derived from the task id (the
+# analyses rowid is not stable across VACUUM) and analyses_fts_ids maps it
+# back. A contentless row can only be removed by replaying the exact values it
+# was indexed with, so every change removes the row using the values currently
+# stored (before the write) and indexes it again afterwards.
+FTS_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5("
+    "query, result, content='', tokenize='porter unicode61')"
+)
+FTS_IDS_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS analyses_fts_ids (rowid INTEGER PRIMARY KEY, task_id TEXT NOT NULL)"
+)
+
+
+def _fts_rowid(task_id: str) -> int:
+    return int.from_bytes(hashlib.sha256(task_id.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+def _fts_enabled(connection) -> bool:
+    return connection.dialect.name == "sqlite"
+
 
+def _fts_stored(connection, task_id: str):
+    """(query, result) as currently stored for an analysis, or None if it has no row."""
+    row = connection.execute(
+        text("SELECT a.query, c.codec, c.result_data FROM analyses a "
+             "LEFT JOIN analysis_contents c ON c.analysis_id = a.id WHERE a.id = :id"),
+        {"id": task_id},
+    ).first()
+    if row is None:
+        return None
+    query, codec, data = row
+    return query, _decompress(codec, data) if data is not None else None
 
-def init_db():
-    """Create all tables if they don't exist."""
-    Base.metadata.create_all(bind=engine)
+
+def _fts_insert_row(connection, task_id: str, query: str, result: str):
+    rowid = _fts_rowid(task_id)
+    connection.execute(
+        text("INSERT INTO analyses_fts (rowid, query, result) VALUES (:rowid, :query, :result)"),
+        {"rowid": rowid, "query": query, "result": result or ""},
+    )
+    connection.execute(
+        text("INSERT INTO analyses_fts_ids (rowid, task_id) VALUES (:rowid, :id)"),
+        {"rowid": rowid, "id": task_id},
+    )
+
+
+def _fts_add(connection, task_id: str):
+    stored = _fts_stored(connection, task_id)
+    if stored is not None:
+        _fts_insert_row(connection, task_id, *stored)
+
+
+def _fts_remove(connection, task_id: str):
+    rowid = _fts_rowid(task_id)
+    indexed = connection.execute(
+        text("SELECT 1 FROM analyses_fts_ids WHERE rowid = :rowid"), {"rowid": rowid}
+    ).first()
+    stored = _fts_stored(connection, task_id) if indexed else None
+    if stored is None:
+        return
+    query, result = stored
+    connection.execute(
+        text("INSERT INTO analyses_fts (analyses_fts, rowid, query, result) "
+             "VALUES ('delete', :rowid, :query, :result)"),
+        {"rowid": rowid, "query": query, "result": result or ""},
+    )
+    connection.execute(text("DELETE FROM analyses_fts_ids WHERE rowid = :rowid"), {"rowid": rowid})
+
+
+@event.listens_for(AnalysisRecord, "after_insert")
+def _fts_insert(mapper, connection, record):
+    if _fts_enabled(connection):
+        _fts_add(connection, record.id)
+
+
+def _result_changed(content) -> bool:
+    return inspect(content).attrs.result_data.history.has_changes()
+
+
+# Content rows are written after their parent row, and deleted before it.
+@event.listens_for(AnalysisContent, "before_insert")
+@event.listens_for(AnalysisContent, "before_update")
+def _fts_content_before_write(mapper, connection, content):
+    if _fts_enabled(connection) and _result_changed(content):
+        _fts_remove(connection, content.analysis_id)
+
+
+@event.listens_for(AnalysisContent, "after_insert")
+@event.listens_for(AnalysisContent, "after_update")
+def _fts_content_after_write(mapper, connection, content):
+    if _fts_enabled(connection) and _result_changed(content):
+        _fts_add(connection, content.analysis_id)
+
+
+@event.listens_for(AnalysisContent, "before_delete")
+def _fts_content_before_delete(mapper, connection, content):
+    if _fts_enabled(connection):
+        _fts_remove(connection, content.analysis_id)
+
+
+@event.listens_for(AnalysisContent, "after_delete")
+def _fts_content_after_delete(mapper, connection, content):
+    # Still searchable by query; a cascaded delete of the parent removes it next.
+    if _fts_enabled(connection):
+        _fts_add(connection, content.analysis_id)
+
+
+@event.listens_for(AnalysisRecord, "before_delete")
+def _fts_delete(mapper, connection, record):
+    if _fts_enabled(connection):
+        _fts_remove(connection, record.id)
+
+
+def _fts_match_expression(q: str) -> str:
+    """Turn free text into an FTS5 query: every term quoted, all terms required."""
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+SEARCH_SNIPPET_WORDS = 16
+
+_WORD = re.compile(r"\w+")
+_STEM_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ed", "es", "s", "ly")
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping, close enough to Porter to highlight inflected matches."""
+    word = word.casefold()
+    for suffix in _STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def highlight_snippet(result: str, q: str, words: int = SEARCH_SNIPPET_WORDS) -> str:
+    """
+    Window of `words` words around the first match in `result`, matched words
+    wrapped in [...]; the window starts at the top when only the query matched.
+    """
+    tokens = list(_WORD.finditer(result or ""))
+    if not tokens:
+        return ""
+    stems = {_stem(term) for term in _WORD.findall(q)}
+    hits = {i for i, token in enumerate(tokens) if _stem(token.group()) in stems}
+    start = max(0, min(min(hits) - words // 4, len(tokens) - words)) if hits else 0
+    end = min(len(tokens), start + words)
+
+    parts, pos = [], tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        parts.append(result[pos:token.start()])
+        parts.append(f"[{token.group()}]" if i in hits else token.group())
+        pos = token.end()
+    snippet = " ".join("".join(parts).split())
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(tokens) else "")
+
+
+class SearchHit(NamedTuple):
+    id: str
+    filename: str
+    status: str
+    created_at: datetime.datetime
+    result_snippet: str
+    score: float
+
+
+async def search_analyses(db, q: str, limit: int = 20):
+    """
+    Ranked full-text hits over past queries and results, with highlighted snippets.
+
+    The index is contentless, so snippets are cut from the compressed results
+    of the returned hits only. Raises NotImplementedError off SQLite, where the
+    FTS5 index is not maintained.
+    """
+    if not _fts_enabled(db.get_bind()):
+        raise NotImplementedError(f"full-text search requires SQLite, not {db.get_bind().dialect.name}")
+    result = await db.execute(
+        text(
+            "SELECT a.id, a.filename, a.status, a.created_at, c.codec, c.result_data, m.score "
+            "FROM (SELECT rowid, bm25(analyses_fts) AS score FROM analyses_fts "
+            "      WHERE analyses_fts MATCH :match ORDER BY score LIMIT :limit) m "
+            "JOIN analyses_fts_ids ids ON ids.rowid = m.rowid "
+            "JOIN analyses a ON a.id = ids.task_id "
+            "LEFT JOIN analysis_contents c ON c.analysis_id = a.id "
+            "ORDER BY m.score"
+        ).columns(created_at=DateTime),
+        {"match": _fts_match_expression(q), "limit": limit},
+    )
+    return [
+        SearchHit(row_id, filename, status, created_at,
+                  highlight_snippet(_decompress(codec, data) if data is not None else "", q), score)
+        for row_id, filename, status, created_at, codec, data, score in result.fetchall()
+    ]
+
+
+def hash_query(query: str) -> str:
+    """Hash a query after case-folding and collapsing whitespace."""
+    normalized = " ".join(query.split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def find_completed_analysis(db, content_hash: str, query_hash: str):
+    """Return the most recent completed analysis of this (document, query) pair, if any."""
+    return (
+        db.query(AnalysisRecord)
+        .filter(
+            AnalysisRecord.content_hash == content_hash,
+            AnalysisRecord.query_hash == query_hash,
+            AnalysisRecord.status == "completed",
+        )
+        .order_by(AnalysisRecord.completed_at.desc())
+        .first()
+    )
+
+
+def save_checkpoint(db, task_id: str, stage: str, value: str = None):
+    """Durably record that `stage` finished for an analysis, with its output if any."""
+    db.merge(AnalysisCheckpoint(
+        analysis_id=task_id, stage=stage, codec=RESULT_CODEC, data=_compress(value),
+    ))
+    db.commit()
+
+
+def load_checkpoints(db, task_id: str) -> dict:
+    """Map of finished stage -> stored output (None for stages without one)."""
+    rows = db.query(AnalysisCheckpoint).filter(AnalysisCheckpoint.analysis_id == task_id).all()
+    return {row.stage: _decompress(row.codec, row.data) for row in rows}
+
+
+def clear_checkpoints(db, task_id: str):
+    """Drop an analysis's checkpoints once it reached a terminal state."""
+    db.query(AnalysisCheckpoint).filter(AnalysisCheckpoint.analysis_id == task_id).delete()
+    db.commit()
+
+
+def _migrate(bind):
+    """Add columns and indexes introduced after a database was first created."""
+    table = AnalysisRecord.__table__
+    existing = {col["name"] for col in inspect(bind).get_columns(table.name)}
+
+    with bind.begin() as conn:
+        for column in table.columns:
+            if column.name not in existing:
+                col_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+
+        if "result" in existing or "error" in existing:
+            _move_results_out_of_row(conn, existing)
+
+        if "snippet" not in existing:
+            _backfill_snippets(conn)
+
+        # Seed the counters once from the existing rows (atomic, so concurrent
+        # starters cannot both seed).
+        conn.execute(text(
+            "INSERT INTO analysis_counts (status, count) "
+            "SELECT status, COUNT(*) FROM analyses "
+            "WHERE NOT EXISTS (SELECT 1 FROM analysis_counts) AND status IS NOT NULL "
+            "GROUP BY status"
+        ))
+
+        for name in _SUPERSEDED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+        if bind.dialect.name == "sqlite":
+            fts = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = 'analyses_fts'")
+            ).first()
+            if fts is not None and "content=''" not in fts[0]:
+                # Earlier layout kept its own copy of every result.
+                conn.execute(text("DROP TABLE analyses_fts"))
+                conn.execute(text("DROP TABLE IF EXISTS analyses_fts_ids"))
+                fts = None
+            if fts is None:
+                conn.execute(text(FTS_TABLE_SQL))
+                conn.execute(text(FTS_IDS_TABLE_SQL))
+                _backfill_fts(conn)
+
+    for index in table.indexes:
+        index.create(bind=bind, checkfirst=True)
+
+
+# Indexes replaced by wider ones that also cover keyset pagination.
+_SUPERSEDED_INDEXES = ("ix_analyses_created_at", "ix_analyses_status_created_at")
+
+
+def _move_results_out_of_row(conn, existing, batch_size: int = 500):
+    """
+    Migrate inline result/error text into compressed analysis_contents rows,
+    then drop the legacy columns (SQLite 3.35+; older versions just clear them).
+    Run VACUUM afterwards to return the freed pages to the filesystem.
+    """
+    legacy = [name for name in ("result", "error") if name in existing]
+    select_cols = ", ".join(name if name in legacy else "NULL" for name in ("result", "error"))
+    not_null = " OR ".join(f"{name} IS NOT NULL" for name in legacy)
+
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            text(f"SELECT id, {select_cols} FROM analyses WHERE id > :last AND ({not_null}) "
+                 "ORDER BY id LIMIT :n"),
+            {"last": last_id, "n": batch_size},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            text("INSERT INTO analysis_contents (analysis_id, codec, result_data, error_data) "
+                 "VALUES (:id, :codec, :result, :error)"),
+            [{"id": row_id, "codec": RESULT_CODEC, "result": _compress(result), "error": _compress(error)}
+             for row_id, result, error in rows],
+        )
+        last_id = rows[-1][0]
+
+    can_drop = conn.dialect.name != "sqlite" or sqlite3.sqlite_version_info >= (3, 35, 0)
+    for name in legacy:
+        if can_drop:
+            conn.execute(text(f"ALTER TABLE analyses DROP COLUMN {name}"))
+        else:
+            conn.execute(text(f"UPDATE analyses SET {name} = NULL"))
+
+
+def _iter_analyses_with_results(conn, batch_size: int = 500, only_with_result: bool = False):
+    """Yield (id, query, result) for every analysis, decompressing stored results."""
+    join = "JOIN" if only_with_result else "LEFT JOIN"
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            text("SELECT a.id, a.query, c.codec, c.result_data FROM analyses a "
+                 f"{join} analysis_contents c ON c.analysis_id = a.id "
+                 "WHERE a.id > :last ORDER BY a.id LIMIT :n"),
+            {"last": last_id, "n": batch_size},
+        ).fetchall()
+        if not rows:
+            return
+        for row_id, query, codec, data in rows:
+            yield row_id, query, _decompress(codec, data) if data is not None else None
+        last_id = rows[-1][0]
+
+
+def _backfill_snippets(conn):
+    """Compute snippets for results stored before the column existed."""
+    for row_id, _, result in _iter_analyses_with_results(conn, only_with_result=True):
+        if result:
+            conn.execute(
+                text("UPDATE analyses SET snippet = :snippet WHERE id = :id"),
+                {"id": row_id, "snippet": make_snippet(result)},
+            )
+
+
+def _backfill_fts(conn):
+    """Index analyses stored before the search table existed."""
+    for row_id, query, result in _iter_analyses_with_results(conn):
+        _fts_insert_row(conn, row_id, query, result)
+
+
+def init_db(bind=None):
+    """Create all tables if they don't exist and bring older schemas up to date."""
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    _migrate(bind)
 
 
 def get_db():
@@ -42,3 +668,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an asyncio DB session."""
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -0,0 +1,253 @@
+"""
+Streaming text extraction for financial PDF documents.
+Pages are read and normalized one at a time and joined once at the end,
+so a large filing is processed in a single linear pass.
+
+Large documents are split into page ranges and extracted in a process pool;
+small ones stay serial, where pool start-up and pickling would dominate.
+Page headers, footers and banners repeated across pages are then stripped.
+Results are cached by PDF content hash, so re-uploads skip parsing entirely.
+"""
+
+import math
+import multiprocessing
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from pypdf import PdfReader
+
+from cache import document_cache, sha256_file
+
+# Worker processes used for parallel extraction (defaults to every core).
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1))
+
+# Documents shorter than this are always extracted serially.
+PARALLEL_MIN_PAGES = int(os.getenv("PARALLEL_EXTRACTION_MIN_PAGES", "50"))
+
+# Boilerplate stripping: an edge line (one of the first/last
+# BOILERPLATE_EDGE_LINES non-blank lines of a page) is removed when the same
+# line appears at the edge of more than BOILERPLATE_MIN_FRACTION of the pages.
+BOILERPLATE_MIN_FRACTION = float(os.getenv("BOILERPLATE_MIN_FRACTION", "0.5"))
+BOILERPLATE_EDGE_LINES = int(os.getenv("BOILERPLATE_EDGE_LINES", "3"))
+# Shorter documents are left alone: in an earnings release of a few pages,
+# the statement pages alone are "more than half" and share their edge lines.
+BOILERPLATE_MIN_PAGES = int(os.getenv("BOILERPLATE_MIN_PAGES", "10"))
+
+# Bump when normalization changes so stale cache entries are not reused.
+EXTRACTION_VERSION = 4
+
+# Unicode oddities common in PDF text: no-break and typographic spaces become
+# plain spaces; soft hyphens, zero-width characters and BOMs are dropped.
+_UNICODE_FIXES = str.maketrans({
+    "\u00a0": " ", "\u2007": " ", "\u202f": " ", "\u2009": " ", "\u200a": " ",
+    "\u2002": " ", "\u2003": " ", "\u3000": " ",
+    "\u00ad": None, "\u200b": None, "\u200c": None, "\u200d": None, "\u2060": None, "\ufeff": None,
+})
+
+# Whitespace around a line break, including whole blank lines, folds to one newline.
+_LINE_BREAKS = re.compile(r"[ \t\f\v\r]*\n\s*")
+# Any other run of horizontal whitespace collapses to a single space.
+_SPACES = re.compile(r"[ \t\f\v\r]{2,}|[\t\f\v\r]")
+
+# Page numbers are masked in fingerprints, so "Page 7" and "Page 8" match:
+# a line that is only a number ("7", "- 7 -"), "page 7" and "7 of 300".
+# Other numbers, such as small amounts in table rows, are left as they are.
+_PAGE_NUMBER = re.compile(
+    r"^[\s\-–—]*\d{1,4}[\s\-–—]*$|\bpage\s+\d{1,4}(?:\s+of\s+\d{1,4})?\b|\b\d{1,4}\s+of\s+\d{1,4}\b"
+)
+
+# Statement unit lines ("(In millions, except per share data)") and period
+# headers ("2024 2023") repeat on every statement page, but the table parser
+# needs them, so they are never stripped. Shared with tables.py.
+UNIT_LINE = re.compile(r"\bin\s+(thousands|millions|billions)\b", re.IGNORECASE)
+PERIOD_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+GROUPED_NUMBER = re.compile(r"\d,\d{3}|\(\s*\d")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize extracted document text in linear time.
+
+    Replaces the character-by-character slicing loops the tools used to run,
+    which were quadratic in the document length.
+
+    - NBSP and other typographic spaces become plain spaces
+    - soft hyphens and zero-width characters are removed
+    - runs of spaces and tabs collapse to a single space
+    - blank lines (and whitespace around line breaks) fold to one newline
+    """
+    text = text.translate(_UNICODE_FIXES)
+    text = _LINE_BREAKS.sub("\n", text)
+    return _SPACES.sub(" ", text)
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Extract and normalize pages [start, stop) — runs inside a pool worker."""
+    reader = PdfReader(path)
+    return [normalize_text(reader.pages[i].extract_text()) for i in range(start, stop)]
+
+
+def _pool_context():
+    """
+    Start method for pool workers. The pool is created lazily from request and
+    queue threads, and forking a multithreaded process can copy locks another
+    thread holds (logging, sqlite), deadlocking the child. A fork server,
+    which only ever holds this module, forks the workers instead.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Instead of the default __main__, which would import the whole API.
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazily create the per-process extraction pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS, mp_context=_pool_context())
+        return _pool
+
+
+def _can_fork_workers() -> bool:
+    # Celery prefork children are daemonic and may not start child processes.
+    return EXTRACTION_WORKERS > 1 and not multiprocessing.current_process().daemon
+
+
+def iter_pages(path: str, parallel: Optional[bool] = None) -> Iterator[str]:
+    """
+    Yield the normalized text of each page in the PDF, in order.
+
+    PyPDFLoader.load() builds a Document for every page before returning,
+    so pypdf (which PyPDFLoader wraps) is read directly to keep only one
+    page (or one page range, in parallel mode) in flight at a time.
+
+    Args:
+        path (str): Path of the PDF file.
+        parallel (bool, optional): Force parallel (True) or serial (False)
+            extraction. By default the page count decides.
+    """
+    reader = PdfReader(path)
+    page_count = len(reader.pages)
+
+    if parallel is None:
+        parallel = page_count >= PARALLEL_MIN_PAGES
+    if not parallel or not _can_fork_workers():
+        for page in reader.pages:
+            yield normalize_text(page.extract_text())
+        return
+
+    # Two ranges per worker keeps every core busy when page costs are uneven.
+    chunk = max(1, math.ceil(page_count / (EXTRACTION_WORKERS * 2)))
+    starts = range(0, page_count, chunk)
+    stops = [min(start + chunk, page_count) for start in starts]
+    pool = _get_pool()
+    for pages in pool.map(_extract_page_range, [path] * len(stops), starts, stops):
+        yield from pages
+
+
+def extract_text(path: str, parallel: Optional[bool] = None) -> str:
+    """Extract the full normalized text of a PDF, one line break per page."""
+    return "".join(f"{page}\n" for page in iter_pages(path, parallel=parallel))
+
+
+def _fingerprint(line: str) -> int:
+    return hash(_PAGE_NUMBER.sub("#", line.strip().lower()))
+
+
+def is_statement_header(line: str) -> bool:
+    """True for a statement unit line or a period header naming two or more years."""
+    if UNIT_LINE.search(line):
+        return True
+    return len(PERIOD_YEAR.findall(line)) >= 2 and not GROUPED_NUMBER.search(line)
+
+
+def strip_boilerplate(pages: List[str], min_fraction: float = BOILERPLATE_MIN_FRACTION,
+                      edge_lines: int = BOILERPLATE_EDGE_LINES,
+                      min_pages: int = BOILERPLATE_MIN_PAGES) -> Tuple[List[str], int]:
+    """
+    Remove page headers, footers and banners repeated across pages.
+
+    Only the first and last `edge_lines` non-blank lines of each page are
+    candidates, so table rows and body text that happen to repeat are kept,
+    and statement unit and period header lines never are. A candidate is
+    dropped when its fingerprint (lowercased, page numbers masked) occurs at
+    the edge of more than `min_fraction` of the pages. Documents shorter
+    than `min_pages` pages are returned unchanged.
+
+    Returns:
+        tuple: (stripped pages, number of lines removed).
+    """
+    if len(pages) < min_pages or edge_lines <= 0:
+        return pages, 0
+
+    split_pages, edge_fingerprints = [], []
+    pages_with = Counter()
+    for page in pages:
+        lines = page.split("\n")
+        non_blank = [i for i, line in enumerate(lines) if line.strip()]
+        edges = set(non_blank[:edge_lines] + non_blank[-edge_lines:])
+        fingerprints = {i: _fingerprint(lines[i]) for i in edges if not is_statement_header(lines[i])}
+        pages_with.update(set(fingerprints.values()))
+        split_pages.append(lines)
+        edge_fingerprints.append(fingerprints)
+
+    limit = min_fraction * len(pages)
+    repeated = {fp for fp, count in pages_with.items() if count > limit}
+    if not repeated:
+        return pages, 0
+
+    stripped, removed = [], 0
+    for lines, fingerprints in zip(split_pages, edge_fingerprints):
+        drop = {i for i, fp in fingerprints.items() if fp in repeated}
+        removed += len(drop)
+        stripped.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return stripped, removed
+
+
+class ExtractedDocument(NamedTuple):
+    """Normalized document text plus the character offset where each page starts."""
+    sha256: str
+    text: str
+    page_offsets: List[int]
+
+    def page(self, number: int) -> str:
+        """Return the text of a single zero-based page."""
+        end = self.page_offsets[number + 1] if number + 1 < len(self.page_offsets) else len(self.text)
+        return self.text[self.page_offsets[number]:end]
+
+
+def load_document(path: str, sha256: Optional[str] = None) -> ExtractedDocument:
+    """
+    Return the extracted document, consulting the content-addressed cache first.
+
+    Args:
+        path (str): Path of the PDF file.
+        sha256 (str, optional): Precomputed hash of the file, if already known.
+    """
+    sha256 = sha256 or sha256_file(path)
+    key = f"{sha256}-text-v{EXTRACTION_VERSION}"
+
+    cached = document_cache.get(key)
+    if cached is not None:
+        return ExtractedDocument(sha256, cached["text"], cached["page_offsets"])
+
+    pages, _ = strip_boilerplate(list(iter_pages(path)))
+    parts, page_offsets, offset = [], [], 0
+    for page in pages:
+        page_offsets.append(offset)
+        parts.append(f"{page}\n")
+        offset += len(page) + 1
+    text = "".join(parts)
+
+    document_cache.put(key, {"text": text, "page_offsets": page_offsets})
+    return ExtractedDocument(sha256, text, page_offsets)
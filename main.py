@@ -1,13 +1,31 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer_group, joinedload
 import os
 import uuid
+import base64
+import asyncio
+import hashlib
 import datetime
-
-from crewai import Crew, Process
-from agents import financial_analyst
-from task import analysis_task
-from database import init_db, get_db, AnalysisRecord
+from concurrent.futures import ThreadPoolExecutor
+
+from crew_pool import crew_pool
+from queue_backend import queue_backend
+from pipeline import upload_path, remove_upload
+from database import (
+    init_db, get_db, get_async_db, dispose_async_engine, AnalysisRecord, hash_query, find_completed_analysis,
+    count_analyses, search_analyses, save_checkpoint,
+)
+from notifier import notifier, record_event, format_sse, track_progress, TERMINAL_STATUSES
+from extraction import load_document
+from retrieval import load_passage_index
+from sections import load_section_index
+from tables import load_tables
+from ratios import ratio_context
+from timing import StageTimer, timings_response
+from cache import document_scope, sha256_file
 
 # Initialize database tables on startup
 init_db()
@@ -23,20 +41,144 @@ app = FastAPI(
 )
 
 
-def run_crew_sync(query: str, file_path: str) -> str:
+# Synchronous analyses run on a dedicated thread pool so a long LLM run never
+# blocks the event loop. Requests beyond the pool size wait in a bounded queue;
+# once that is full, new requests are rejected with 503 + Retry-After.
+SYNC_ANALYSIS_CONCURRENCY = int(os.getenv("SYNC_ANALYSIS_CONCURRENCY", "2"))
+SYNC_ANALYSIS_QUEUE_LIMIT = int(os.getenv("SYNC_ANALYSIS_QUEUE_LIMIT", "8"))
+SYNC_ANALYSIS_RETRY_AFTER = int(os.getenv("SYNC_ANALYSIS_RETRY_AFTER", "30"))
+
+
+class BoundedAnalysisExecutor:
+    """Thread pool for blocking crew runs with a capped number of waiting jobs."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0  # running + waiting; only touched from the event loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-analysis")
+
+    def try_reserve(self) -> bool:
+        """Claim a slot (running or queued). Returns False when the queue is full."""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    async def run(self, fn, *args, cleanup=None):
+        """
+        Run `fn(*args)` on the pool and await its result.
+
+        The slot claimed by try_reserve() is released, and `cleanup()` called,
+        only once `fn` has finished (or was cancelled before starting), even
+        when the awaiting request is cancelled first. A disconnected client
+        therefore never frees capacity or files while its crew is still running.
+        """
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+
+        def _finished(_):
+            if cleanup is not None:
+                cleanup()
+            try:
+                loop.call_soon_threadsafe(self.release)
+            except RuntimeError:
+                pass  # event loop already closed at shutdown
+
+        future.add_done_callback(_finished)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+sync_executor = BoundedAnalysisExecutor(SYNC_ANALYSIS_CONCURRENCY, SYNC_ANALYSIS_QUEUE_LIMIT)
+
+
+@app.on_event("startup")
+async def start_background_services():
+    notifier.start()
+    queue_backend.start()
+    # Build the crews now so the first analyses don't pay for construction.
+    await asyncio.to_thread(crew_pool.warm)
+
+
+@app.on_event("shutdown")
+async def shutdown_background_services():
+    sync_executor.shutdown()
+    queue_backend.shutdown()
+    await notifier.stop()
+    await dispose_async_engine()
+
+
+def run_crew_sync(query: str, file_path: str, task_id: str = None,
+                  timer: StageTimer = None, content_hash: str = None) -> str:
     """Run the CrewAI crew synchronously."""
-    financial_crew = Crew(
-        agents=[financial_analyst],
-        tasks=[analysis_task],
-        process=Process.sequential,
-    )
-    result = financial_crew.kickoff(inputs={
-        "query": query,
-        "file_path": file_path,
-    })
+    timer = timer or StageTimer()
+    timer.mark("started")
+
+    # Extract and index up front so it is timed on its own; the reader tools then hit the cache.
+    load_document(file_path, sha256=content_hash)
+    load_passage_index(file_path, sha256=content_hash)
+    load_section_index(file_path, sha256=content_hash)
+    load_tables(file_path, sha256=content_hash)
+    ratio_context(file_path, sha256=content_hash)
+    timer.mark("extracted")
+
+    with crew_pool.crew() as financial_crew:
+        timer.mark("crew_ready")
+        with track_progress(task_id), timer.activate(), document_scope(content_hash or sha256_file(file_path)):
+            result = financial_crew.kickoff(inputs={
+                "query": query,
+                "file_path": file_path,
+                "financial_ratios": ratio_context(file_path, sha256=content_hash),
+            })
+    timer.mark("analyzed")
     return str(result)
 
 
+# Uploads are streamed to disk in fixed-size chunks instead of being read into
+# memory, and hashed in the same pass.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "100"))
+
+
+async def save_upload(file: UploadFile, file_path: str) -> tuple:
+    """
+    Stream an uploaded file to `file_path`.
+
+    Returns:
+        tuple: (sha256 hex digest, size in bytes) of the uploaded content.
+
+    Raises:
+        HTTPException: 413 if the upload exceeds MAX_UPLOAD_MB. The partial
+            file is removed before raising.
+    """
+    max_bytes = MAX_UPLOAD_MB * 1024 * 1024
+    digest = hashlib.sha256()
+    size = 0
+
+    with open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+
+    if size > max_bytes:
+        os.remove(file_path)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum upload size is {MAX_UPLOAD_MB} MB.",
+        )
+
+    return digest.hexdigest(), size
+
+
 # ─────────────────────────────────────────
 # Health Check
 # ─────────────────────────────────────────
@@ -51,9 +193,13 @@ async def root():
             "sync_analyze": "POST /analyze",
             "async_analyze": "POST /analyze/async",
             "check_status": "GET /status/{task_id}",
+            "stream_status": "GET /status/{task_id}/stream",
             "history": "GET /history",
             "get_analysis": "GET /history/{task_id}",
-        }
+            "search": "GET /search?q=",
+        },
+        "queue_backend": queue_backend.name,
+        "crew_pool": crew_pool.stats(),
     }
 
 
@@ -65,29 +211,58 @@ async def root():
 async def analyze_document(
     file: UploadFile = File(...),
     query: str = Form(default="Analyze this financial document for investment insights"),
+    force: bool = Form(default=False),
     db: Session = Depends(get_db)
 ):
     """
     **Synchronous** analysis — waits for the result before responding.
     Best for single requests. Use `/analyze/async` for concurrent requests.
+
+    If the same document was already analyzed for the same query, the stored
+    result is returned immediately. Pass `force=true` to run a fresh analysis.
     """
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
+    if not sync_executor.try_reserve():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many synchronous analyses in progress. Retry later or use /analyze/async.",
+            headers={"Retry-After": str(SYNC_ANALYSIS_RETRY_AFTER)},
+        )
+
     task_id = str(uuid.uuid4())
-    file_path = f"data/financial_document_{task_id}.pdf"
+    file_path = upload_path(task_id)
+    timer = StageTimer()
+    timer.mark("received")
+    submitted = False  # once the crew is submitted, the executor releases the slot and file
 
     try:
         os.makedirs("data", exist_ok=True)
 
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        content_hash, _ = await save_upload(file, file_path)
+        timer.mark("uploaded")
 
         if not query or query.strip() == "":
             query = "Analyze this financial document for investment insights"
 
         query = query.strip()
+        query_hash = hash_query(query)
+
+        # Reuse a completed analysis of the same (document, query) pair
+        if not force:
+            previous = find_completed_analysis(db, content_hash, query_hash)
+            if previous:
+                return {
+                    "status": "success",
+                    "task_id": previous.id,
+                    "query": query,
+                    "analysis": previous.result,
+                    "file_processed": file.filename,
+                    "duration_seconds": previous.duration_seconds,
+                    "deduplicated": True,
+                }
+
         start_time = datetime.datetime.utcnow()
 
         # Save record to DB
@@ -96,22 +271,33 @@ async def analyze_document(
             filename=file.filename,
             query=query,
             status="processing",
+            content_hash=content_hash,
+            query_hash=query_hash,
         )
         db.add(record)
         db.commit()
-
-        # Run analysis
-        result = run_crew_sync(query=query, file_path=file_path)
+        timer.mark("recorded")
+        notifier.publish(record_event(record))
+
+        # Run analysis off the event loop
+        submitted = True
+        result = await sync_executor.run(
+            run_crew_sync, query, file_path, task_id, timer, content_hash,
+            cleanup=lambda: remove_upload(file_path),
+        )
 
         # Update DB with result
         completed_at = datetime.datetime.utcnow()
         duration = (completed_at - start_time).total_seconds()
+        timer.mark("finished")
 
         record.status = "completed"
         record.result = result
         record.completed_at = completed_at
         record.duration_seconds = round(duration, 2)
+        record.stage_timings = timer.to_json()
         db.commit()
+        notifier.publish(record_event(record))
 
         return {
             "status": "success",
@@ -120,24 +306,38 @@ async def analyze_document(
             "analysis": result,
             "file_processed": file.filename,
             "duration_seconds": round(duration, 2),
+            "timings": timings_response(record.stage_timings),
         }
 
-    except Exception as e:
-        record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
-        if record:
-            record.status = "failed"
-            record.error = str(e)
-            record.completed_at = datetime.datetime.utcnow()
-            db.commit()
+    except HTTPException:
+        raise
+
+    except asyncio.CancelledError:
+        # Client disconnected: the crew thread may still be running, but nobody
+        # will store its result, so don't leave the record processing forever.
+        _mark_sync_failed(db, task_id, timer, "Client disconnected before the analysis finished.")
+        raise
 
+    except Exception as e:
+        _mark_sync_failed(db, task_id, timer, str(e))
         raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
 
     finally:
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception:
-                pass
+        if not submitted:
+            sync_executor.release()
+            remove_upload(file_path)
+
+
+def _mark_sync_failed(db: Session, task_id: str, timer: StageTimer, error: str):
+    record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+    if record:
+        timer.mark("failed")
+        record.status = "failed"
+        record.error = error
+        record.completed_at = datetime.datetime.utcnow()
+        record.stage_timings = timer.to_json()
+        db.commit()
+        notifier.publish(record_event(record))
 
 
 # ─────────────────────────────────────────
@@ -148,16 +348,20 @@ async def analyze_document(
 async def analyze_document_async(
     file: UploadFile = File(...),
     query: str = Form(default="Analyze this financial document for investment insights"),
+    force: bool = Form(default=False),
     db: Session = Depends(get_db)
 ):
     """
     **Asynchronous** analysis — immediately returns a `task_id`.
-    Poll `GET /status/{task_id}` to check when the result is ready.
-    Requires Redis and a running Celery worker.
+    Subscribe to `GET /status/{task_id}/stream` (or poll `GET /status/{task_id}`)
+    to find out when the result is ready.
+    With the default Celery backend this requires Redis and a running Celery
+    worker; QUEUE_BACKEND=local runs jobs inside the API process instead.
+
+    If the same document was already analyzed for the same query, the completed
+    task is returned instead of queuing a new one. Pass `force=true` to re-run.
     """
-    try:
-        from worker import analyze_document_task
-    except ImportError:
+    if not queue_backend.available():
         raise HTTPException(
             status_code=503,
             detail="Queue worker unavailable. Ensure Redis is running and Celery is installed."
@@ -167,40 +371,63 @@ async def analyze_document_async(
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
     task_id = str(uuid.uuid4())
-    file_path = f"data/financial_document_{task_id}.pdf"
+    file_path = upload_path(task_id)
+    timer = StageTimer()
+    timer.mark("received")
 
     os.makedirs("data", exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    if not query or query.strip() == "":
-        query = "Analyze this financial document for investment insights"
+    content_hash, _ = await save_upload(file, file_path)
+    timer.mark("uploaded")
 
-    query = query.strip()
+    # From here on, any failure (e.g. a DB error) must not leave the upload behind.
+    try:
+        if not query or query.strip() == "":
+            query = "Analyze this financial document for investment insights"
 
-    # Save to DB as queued
-    record = AnalysisRecord(
-        id=task_id,
-        filename=file.filename,
-        query=query,
-        status="queued",
-    )
-    db.add(record)
-    db.commit()
+        query = query.strip()
+        query_hash = hash_query(query)
+
+        # Reuse a completed analysis of the same (document, query) pair
+        if not force:
+            previous = find_completed_analysis(db, content_hash, query_hash)
+            if previous:
+                remove_upload(file_path)
+                return {
+                    "status": "completed",
+                    "task_id": previous.id,
+                    "message": "An identical analysis already exists. Pass force=true to re-run it.",
+                    "status_url": f"/status/{previous.id}",
+                    "analysis": previous.result,
+                    "deduplicated": True,
+                }
+
+        # Save to DB as queued; the worker continues the same timer
+        timer.mark("enqueued")
+        record = AnalysisRecord(
+            id=task_id,
+            filename=file.filename,
+            query=query,
+            status="queued",
+            content_hash=content_hash,
+            query_hash=query_hash,
+            stage_timings=timer.to_json(),
+        )
+        db.add(record)
+        db.commit()
+        save_checkpoint(db, task_id, "uploaded")
 
-    # Submit to Celery queue
-    analyze_document_task.apply_async(
-        args=[task_id, query, file_path],
-        task_id=task_id
-    )
+        queue_backend.enqueue(task_id, query, file_path)
+    except BaseException:
+        remove_upload(file_path)
+        raise
 
     return {
         "status": "queued",
         "task_id": task_id,
         "message": "Document queued for analysis. Poll /status/{task_id} for results.",
         "status_url": f"/status/{task_id}",
+        "stream_url": f"/status/{task_id}/stream",
     }
 
 
@@ -209,9 +436,13 @@ async def analyze_document_async(
 # ─────────────────────────────────────────
 
 @app.get("/status/{task_id}", tags=["Analysis"])
-async def get_task_status(task_id: str, db: Session = Depends(get_db)):
+async def get_task_status(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """Check the status of an async analysis task."""
-    record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+    record = await db.scalar(
+        select(AnalysisRecord)
+        .options(undefer_group("payload"), joinedload(AnalysisRecord.content))
+        .where(AnalysisRecord.id == task_id)
+    )
 
     if not record:
         raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found.")
@@ -222,9 +453,13 @@ async def get_task_status(task_id: str, db: Session = Depends(get_db)):
         "filename": record.filename,
         "query": record.query,
         "created_at": record.created_at.isoformat(),
+        "timings": timings_response(record.stage_timings),
     }
 
-    if record.status == "completed":
+    if record.status == "processing":
+        response["progress"] = record.progress
+
+    elif record.status == "completed":
         response["analysis"] = record.result
         response["completed_at"] = record.completed_at.isoformat()
         response["duration_seconds"] = record.duration_seconds
@@ -236,32 +471,159 @@ async def get_task_status(task_id: str, db: Session = Depends(get_db)):
     return response
 
 
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@app.get("/status/{task_id}/stream", tags=["Analysis"])
+async def stream_task_status(task_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Stream status transitions as Server-Sent Events.
+
+    Emits a `status` event with the current state, then one per transition
+    (queued → processing → completed / failed) and per intermediate crew step.
+    The stream closes after the terminal event; fetch the full result from
+    `GET /history/{task_id}`.
+    """
+    record = await db.scalar(
+        select(AnalysisRecord)
+        .options(joinedload(AnalysisRecord.content))
+        .where(AnalysisRecord.id == task_id)
+    )
+
+    if not record:
+        raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found.")
+
+    current = record_event(record)
+    await db.close()  # the stream may stay open for minutes; don't hold the session
+
+    async def event_stream():
+        queue = notifier.subscribe(task_id, current)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield format_sse(event)
+                if event["status"] in TERMINAL_STATUSES:
+                    break
+        finally:
+            notifier.unsubscribe(task_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ─────────────────────────────────────────
 # History Endpoints
 # ─────────────────────────────────────────
 
+HISTORY_COUNT_CAP = 10000
+
+
+def _encode_cursor(created_at: datetime.datetime, task_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, task_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.datetime.fromisoformat(created_at), task_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
 @app.get("/history", tags=["History"])
 async def get_analysis_history(
     limit: int = 20,
     status: str = None,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    filename: str = None,
+    created_after: datetime.datetime = None,
+    created_before: datetime.datetime = None,
+    min_duration: float = None,
+    max_duration: float = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Retrieve past analysis records.
+    Retrieve past analysis records, newest first.
 
-    - **limit**: Number of records to return (default: 20, max: 100)
+    - **limit**: Number of records to return (default: 20, clamped to 1-100)
     - **status**: Filter by `queued`, `processing`, `completed`, or `failed`
+    - **cursor**: `next_cursor` from the previous page
+    - **filename**: Filename prefix (case-sensitive)
+    - **created_after** / **created_before**: ISO-8601 creation time range
+    - **min_duration** / **max_duration**: Duration range in seconds
     """
-    limit = min(limit, 100)
-    query_obj = db.query(AnalysisRecord).order_by(AnalysisRecord.created_at.desc())
+    # At least one row per page, or has_more could never yield a cursor.
+    limit = max(1, min(limit, 100))
+
+    # Select only the listed columns; result/error blobs are never read here.
+    query_obj = select(
+        AnalysisRecord.id,
+        AnalysisRecord.filename,
+        AnalysisRecord.query,
+        AnalysisRecord.status,
+        AnalysisRecord.created_at,
+        AnalysisRecord.duration_seconds,
+        AnalysisRecord.snippet,
+    )
 
+    filters = []
     if status:
-        query_obj = query_obj.filter(AnalysisRecord.status == status)
+        filters.append(AnalysisRecord.status == status)
+    if filename:
+        # Range form of a prefix match, so the filename index can be used.
+        filters.append(AnalysisRecord.filename >= filename)
+        filters.append(AnalysisRecord.filename < filename + "\U0010ffff")
+    if created_after:
+        filters.append(AnalysisRecord.created_at >= created_after)
+    if created_before:
+        filters.append(AnalysisRecord.created_at < created_before)
+    if min_duration is not None:
+        filters.append(AnalysisRecord.duration_seconds >= min_duration)
+    if max_duration is not None:
+        filters.append(AnalysisRecord.duration_seconds <= max_duration)
+
+    query_obj = query_obj.where(*filters)
+
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query_obj = query_obj.where(
+            tuple_(AnalysisRecord.created_at, AnalysisRecord.id) < tuple_(cursor_created_at, cursor_id)
+        )
 
-    records = query_obj.limit(limit).all()
+    records = (await db.execute(
+        query_obj
+        .order_by(AnalysisRecord.created_at.desc(), AnalysisRecord.id.desc())
+        .limit(limit + 1)
+    )).all()
+    has_more = len(records) > limit
+    records = records[:limit]
+
+    # Unfiltered (or status-only) totals come from the maintained counters;
+    # other filters get an index-served count capped at HISTORY_COUNT_CAP.
+    total_is_exact = True
+    if len(filters) == (1 if status else 0):
+        total = await count_analyses(db, status)
+    else:
+        matching = select(AnalysisRecord.id).where(*filters).limit(HISTORY_COUNT_CAP + 1).subquery()
+        total = await db.scalar(select(func.count()).select_from(matching))
+        if total > HISTORY_COUNT_CAP:
+            total, total_is_exact = HISTORY_COUNT_CAP, False
 
     return {
-        "total": len(records),
+        "total": total,
+        "total_is_exact": total_is_exact,
+        "next_cursor": _encode_cursor(records[-1].created_at, records[-1].id) if has_more else None,
         "records": [
             {
                 "task_id": r.id,
@@ -270,6 +632,7 @@ async def get_analysis_history(
                 "status": r.status,
                 "created_at": r.created_at.isoformat(),
                 "duration_seconds": r.duration_seconds,
+                "snippet": r.snippet,
             }
             for r in records
         ]
@@ -277,9 +640,13 @@ async def get_analysis_history(
 
 
 @app.get("/history/{task_id}", tags=["History"])
-async def get_analysis_by_id(task_id: str, db: Session = Depends(get_db)):
+async def get_analysis_by_id(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """Retrieve the full analysis result for a specific task."""
-    record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+    record = await db.scalar(
+        select(AnalysisRecord)
+        .options(undefer_group("payload"), joinedload(AnalysisRecord.content))
+        .where(AnalysisRecord.id == task_id)
+    )
 
     if not record:
         raise HTTPException(status_code=404, detail=f"Analysis '{task_id}' not found.")
@@ -294,19 +661,66 @@ async def get_analysis_by_id(task_id: str, db: Session = Depends(get_db)):
         "created_at": record.created_at.isoformat(),
         "completed_at": record.completed_at.isoformat() if record.completed_at else None,
         "duration_seconds": record.duration_seconds,
+        "timings": timings_response(record.stage_timings),
+    }
+
+
+# ─────────────────────────────────────────
+# Search Endpoint
+# ─────────────────────────────────────────
+
+@app.get("/search", tags=["History"])
+async def search_history(q: str, limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    """
+    Full-text search over past queries and analysis results.
+
+    - **q**: Search terms; all terms must match (stemmed, case-insensitive)
+    - **limit**: Number of hits to return (default: 20, clamped to 1-100)
+
+    Hits are ranked by BM25 relevance; matched terms are wrapped in `[...]`
+    in the snippet. Only available on SQLite (501 otherwise).
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query 'q' must not be empty.")
+
+    try:
+        # A negative LIMIT would mean "no limit" to SQLite.
+        hits = await search_analyses(db, q, max(1, min(limit, 100)))
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return {
+        "query": q,
+        "total": len(hits),
+        "results": [
+            {
+                "task_id": h.id,
+                "filename": h.filename,
+                "status": h.status,
+                "created_at": h.created_at.isoformat(),
+                "snippet": h.result_snippet,
+                "score": round(-h.score, 4),
+            }
+            for h in hits
+        ]
     }
 
 
 @app.delete("/history/{task_id}", tags=["History"])
-async def delete_analysis(task_id: str, db: Session = Depends(get_db)):
+async def delete_analysis(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete a specific analysis record."""
-    record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+    # The content row is loaded up front so the cascade needs no lazy load.
+    record = await db.scalar(
+        select(AnalysisRecord)
+        .options(joinedload(AnalysisRecord.content))
+        .where(AnalysisRecord.id == task_id)
+    )
 
     if not record:
         raise HTTPException(status_code=404, detail=f"Analysis '{task_id}' not found.")
 
-    db.delete(record)
-    db.commit()
+    await db.delete(record)
+    await db.commit()
 
     return {"message": f"Analysis '{task_id}' deleted successfully."}
 
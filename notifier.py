@@ -0,0 +1,194 @@
+"""
+In-process fan-out of analysis status updates for Server-Sent Events.
+
+Every SSE client subscribes to a task id and receives events from a single
+StatusNotifier instead of polling the database itself:
+
+- analyses running inside the API process publish their transitions directly
+- analyses running in Celery workers are picked up by one shared watcher that
+  checks all watched tasks with a single query per interval, however many
+  clients are connected
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional, Set
+
+from database import SessionLocal, AnalysisRecord
+
+STATUS_WATCH_INTERVAL = float(os.getenv("STATUS_WATCH_INTERVAL", "1.0"))
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+def record_event(record: AnalysisRecord) -> dict:
+    """Build the status event payload for a record."""
+    event = {
+        "task_id": record.id,
+        "status": record.status,
+        "progress": record.progress,
+    }
+    if record.completed_at:
+        event["completed_at"] = record.completed_at.isoformat()
+    if record.status == "failed":
+        event["error"] = record.error
+    return event
+
+
+def format_sse(event: dict, event_type: str = "status") -> str:
+    """Serialize an event in text/event-stream format."""
+    return f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+
+
+class StatusNotifier:
+    """Single source of status events, fanned out to per-client queues."""
+
+    def __init__(self, watch_interval: float = STATUS_WATCH_INTERVAL):
+        self.watch_interval = watch_interval
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._last_seen: Dict[str, tuple] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Bind to the running event loop and start the shared watcher."""
+        self._loop = asyncio.get_running_loop()
+        self._watcher = self._loop.create_task(self._watch())
+
+    async def stop(self):
+        if self._watcher:
+            self._watcher.cancel()
+
+    def subscribe(self, task_id: str, current: dict) -> asyncio.Queue:
+        """Register a client queue, seeded with the task's current state."""
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        if self._last_seen.get(task_id) == self._key(current):
+            queue.put_nowait(current)
+        else:
+            self._dispatch(current)  # also brings earlier subscribers up to date
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(task_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[task_id]
+            self._last_seen.pop(task_id, None)
+
+    @staticmethod
+    def _key(event: dict) -> tuple:
+        return event["status"], event.get("progress")
+
+    def _dispatch(self, event: dict):
+        # Tasks nobody watches are not tracked, or _last_seen would grow by
+        # one entry per analysis (unsubscribe is what clears it).
+        queues = self._subscribers.get(event["task_id"])
+        if not queues:
+            return
+        key = self._key(event)
+        if self._last_seen.get(event["task_id"]) == key:
+            return
+        self._last_seen[event["task_id"]] = key
+        for queue in queues:
+            queue.put_nowait(event)
+
+    def publish(self, event: dict):
+        """
+        Push a status event to every subscriber of its task.
+
+        Safe to call from the event loop or from worker threads; a no-op in
+        processes that never started the notifier (e.g. Celery workers).
+        """
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._dispatch(event)
+        else:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _fetch(self, task_ids):
+        db = SessionLocal()
+        try:
+            records = db.query(AnalysisRecord).filter(AnalysisRecord.id.in_(task_ids)).all()
+            return [record_event(r) for r in records]
+        finally:
+            db.close()
+
+    async def _watch(self):
+        # Catches transitions made by other processes (Celery workers).
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if not self._subscribers:
+                continue
+            try:
+                events = await asyncio.to_thread(self._fetch, list(self._subscribers))
+            except Exception:
+                continue  # transient DB errors must not kill the watcher
+            for event in events:
+                self._dispatch(event)
+
+
+notifier = StatusNotifier()
+
+
+# ─────────────────────────────────────────
+# Intermediate progress from crew steps
+# ─────────────────────────────────────────
+
+# Crew.kickoff copies its step_callback onto the (shared) agents, so one
+# module-level callback is used everywhere and routes steps to the analysis
+# running in the current thread.
+_current_task_id = contextvars.ContextVar("current_task_id", default=None)
+_step_counts: Dict[str, int] = {}
+
+
+@contextmanager
+def track_progress(task_id: str):
+    """Attribute crew steps executed inside this block to `task_id`."""
+    token = _current_task_id.set(task_id)
+    _step_counts[task_id] = 0
+    try:
+        yield
+    finally:
+        _current_task_id.reset(token)
+        _step_counts.pop(task_id, None)
+
+
+def describe_step(step) -> str:
+    """Short human-readable description of a crew agent step."""
+    tool = getattr(step, "tool", None)
+    if tool:
+        return f"using tool: {tool}"
+    if hasattr(step, "output"):
+        return "writing final answer"
+    return "thinking"
+
+
+def report_step(step):
+    """Crew step_callback: persist and publish the current step of the analysis."""
+    task_id = _current_task_id.get()
+    if task_id is None:
+        return
+    _step_counts[task_id] = _step_counts.get(task_id, 0) + 1
+    progress = f"step {_step_counts[task_id]}: {describe_step(step)}"
+
+    db = SessionLocal()
+    try:
+        record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+        if record is None:
+            return
+        record.progress = progress
+        db.commit()
+        notifier.publish(record_event(record))
+    finally:
+        db.close()
@@ -0,0 +1,182 @@
+"""
+Queued analysis pipeline, shared by every queue backend (Celery or local).
+
+A job runs as checkpointed stages (uploaded -> extracted -> analyzed) recorded
+in analysis_checkpoints, so a retry, a redelivery or a restart skips the
+stages that already finished. The uploaded file is kept until the job
+completes or fails for good.
+"""
+
+import os
+import datetime
+from typing import Optional
+
+from crew_pool import crew_pool
+from database import SessionLocal, AnalysisRecord, save_checkpoint, load_checkpoints, clear_checkpoints
+from notifier import track_progress
+from extraction import load_document
+from retrieval import load_passage_index
+from sections import load_section_index
+from tables import load_tables
+from ratios import ratio_context
+from timing import StageTimer
+from cache import document_scope, sha256_file
+
+ANALYSIS_MAX_RETRIES = 2
+ANALYSIS_RETRY_COUNTDOWN = 5
+
+
+class RetryStage(Exception):
+    """A stage failed but has attempts left; the job was put back to queued."""
+
+
+def upload_path(task_id: str) -> str:
+    """Where the API stores the uploaded PDF of an analysis."""
+    return f"data/financial_document_{task_id}.pdf"
+
+
+def remove_upload(file_path: str):
+    if os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+        except Exception:
+            pass
+
+
+def _start_stage(db, task_id: str, file_path: str, stage: str):
+    """
+    Load the record and mark it processing. Returns (record, timer), or
+    (None, None) if the job was deleted or already finished (redelivery).
+    """
+    record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+    if record is None or record.status in ("completed", "failed"):
+        remove_upload(file_path)
+        return None, None
+
+    # Continue the timer stored by the API / previous stage, so queue wait
+    # shows up in the duration of `stage`.
+    timer = StageTimer(record.stage_timings)
+    timer.mark(stage)
+    record.status = "processing"
+    db.commit()
+    return record, timer
+
+
+def _extract(db, record, timer: StageTimer, checkpoints: dict, file_path: str):
+    if "extracted" in checkpoints:
+        return
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Uploaded document is gone: {file_path}")
+    # Extract and index up front so it is timed on its own; the reader tools
+    # then hit the (on-disk) document cache, also on later retries.
+    load_document(file_path, sha256=record.content_hash)
+    load_passage_index(file_path, sha256=record.content_hash)
+    load_section_index(file_path, sha256=record.content_hash)
+    load_tables(file_path, sha256=record.content_hash)
+    ratio_context(file_path, sha256=record.content_hash)
+    save_checkpoint(db, record.id, "extracted")
+    timer.mark("extracted")
+
+
+def extract_stage(db, record, timer: StageTimer, query: str, file_path: str):
+    """CPU stage: extract the document into the document cache and checkpoint it."""
+    _extract(db, record, timer, load_checkpoints(db, record.id), file_path)
+    record.stage_timings = timer.to_json()
+    db.commit()
+    return {"status": "extracted"}
+
+
+def analysis_stage(db, record, timer: StageTimer, query: str, file_path: str):
+    """I/O stage: run the crew (extracting first if needed) and store the result."""
+    checkpoints = load_checkpoints(db, record.id)
+    result = checkpoints.get("analyzed")
+
+    if result is None:
+        _extract(db, record, timer, checkpoints, file_path)
+
+        # Run the CrewAI crew
+        with crew_pool.crew() as financial_crew:
+            timer.mark("crew_ready")
+            with track_progress(record.id), timer.activate(), \
+                    document_scope(record.content_hash or sha256_file(file_path)):
+                result = str(financial_crew.kickoff(inputs={
+                    "query": query,
+                    "file_path": file_path,
+                    "financial_ratios": ratio_context(file_path, sha256=record.content_hash),
+                }))
+        # The crew has a single task, so its output is the crew result.
+        save_checkpoint(db, record.id, "analyzed", result)
+        timer.mark("analyzed")
+
+    # Save result to DB; the duration spans queueing and every stage.
+    timer.mark("finished")
+    record.status = "completed"
+    record.result = result
+    record.completed_at = datetime.datetime.utcnow()
+    record.duration_seconds = round((record.completed_at - record.created_at).total_seconds(), 2)
+    record.stage_timings = timer.to_json()
+    db.commit()
+
+    clear_checkpoints(db, record.id)
+    remove_upload(file_path)
+    return {"status": "completed", "result": result}
+
+
+def _retry_or_fail(db, task_id: str, file_path: str, timer: Optional[StageTimer], exc: Exception,
+                   attempt: int, max_retries: int):
+    """Requeue the job for another attempt, or record the final failure and clean up."""
+    db.rollback()
+    final = attempt >= max_retries or isinstance(exc, FileNotFoundError)
+
+    record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
+    if record and timer is None:
+        # The stage failed before it started: continue the stored timings.
+        timer = StageTimer(record.stage_timings)
+    if record and not final:
+        # Back to the queue; checkpoints and the upload are kept for the retry.
+        timer.mark("retrying")
+        record.status = "queued"
+        record.progress = f"retry {attempt + 1} of {max_retries} after error: {exc}"
+        record.stage_timings = timer.to_json()
+        db.commit()
+        raise RetryStage(str(exc)) from exc
+
+    # Save error to DB
+    if record:
+        timer.mark("failed")
+        record.status = "failed"
+        record.error = str(exc)
+        record.completed_at = datetime.datetime.utcnow()
+        record.duration_seconds = round((record.completed_at - record.created_at).total_seconds(), 2)
+        record.stage_timings = timer.to_json()
+        db.commit()
+        clear_checkpoints(db, task_id)
+
+    remove_upload(file_path)
+    raise exc
+
+
+def run_stage(stage, start_mark: str, task_id: str, query: str, file_path: str,
+              attempt: int = 0, max_retries: int = ANALYSIS_MAX_RETRIES):
+    """
+    Run one pipeline stage for a queued analysis.
+
+    Raises:
+        RetryStage: the stage failed with attempts left; the caller should run
+            it again after ANALYSIS_RETRY_COUNTDOWN seconds.
+        Exception: the original error once the job has been marked failed.
+    """
+    db = SessionLocal()
+    timer = None  # set once _start_stage has loaded the stored timings
+
+    try:
+        record, timer = _start_stage(db, task_id, file_path, start_mark)
+        if record is None:
+            return {"status": "skipped"}
+        return stage(db, record, timer, query, file_path)
+
+    except Exception as e:
+        _retry_or_fail(db, task_id, file_path, timer, e, attempt, max_retries)
+
+    finally:
+        db.close()
@@ -0,0 +1,117 @@
+"""
+Pluggable job queue behind POST /analyze/async.
+
+- CeleryQueueBackend (QUEUE_BACKEND=celery, default): distributed; needs Redis
+  and Celery workers (see worker.py).
+- LocalQueueBackend (QUEUE_BACKEND=local): a thread pool inside the API
+  process for single-node deployments. The queue itself is the analyses
+  table: jobs still queued or processing when the process stopped are picked
+  up again on startup and resume from their checkpoints.
+
+Both run the same checkpointed stages from pipeline.py.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database import SessionLocal, AnalysisRecord
+from pipeline import (
+    run_stage, extract_stage, analysis_stage, upload_path, RetryStage,
+    ANALYSIS_MAX_RETRIES, ANALYSIS_RETRY_COUNTDOWN,
+)
+
+QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "celery").lower()
+LOCAL_QUEUE_WORKERS = int(os.getenv("LOCAL_QUEUE_WORKERS", "4"))
+
+
+class CeleryQueueBackend:
+    name = "celery"
+
+    def start(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def available(self) -> bool:
+        try:
+            import worker  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def enqueue(self, task_id: str, query: str, file_path: str):
+        from worker import enqueue_analysis
+        enqueue_analysis(task_id, query, file_path)
+
+
+class LocalQueueBackend:
+    """Runs queued analyses on an in-process thread pool, recovering them from the DB on startup."""
+
+    name = "local"
+
+    def __init__(self, max_workers: int = LOCAL_QUEUE_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start the pool and resubmit jobs left queued/processing by a previous run."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="local-queue")
+        for task_id, query in self._unfinished_jobs():
+            self.enqueue(task_id, query, upload_path(task_id))
+
+    def shutdown(self):
+        # Running jobs are abandoned, not failed: they resume on the next start.
+        self._stopping.set()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def available(self) -> bool:
+        return self._executor is not None and not self._stopping.is_set()
+
+    def submit(self, fn, *args):
+        """Run `fn(*args)` on the pool."""
+        return self._executor.submit(fn, *args)
+
+    def enqueue(self, task_id: str, query: str, file_path: str):
+        self.submit(self._run_job, task_id, query, file_path)
+
+    @staticmethod
+    def _unfinished_jobs():
+        db = SessionLocal()
+        try:
+            return (
+                db.query(AnalysisRecord.id, AnalysisRecord.query)
+                .filter(AnalysisRecord.status.in_(("queued", "processing")))
+                .order_by(AnalysisRecord.created_at)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def _run_job(self, task_id: str, query: str, file_path: str):
+        for attempt in range(ANALYSIS_MAX_RETRIES + 1):
+            try:
+                run_stage(extract_stage, "started", task_id, query, file_path,
+                          attempt=attempt, max_retries=ANALYSIS_MAX_RETRIES)
+                run_stage(analysis_stage, "llm_started", task_id, query, file_path,
+                          attempt=attempt, max_retries=ANALYSIS_MAX_RETRIES)
+                return
+            except RetryStage:
+                if self._stopping.wait(ANALYSIS_RETRY_COUNTDOWN):
+                    return
+            except Exception:
+                return  # recorded as failed by the pipeline
+
+
+def make_queue_backend(name: str = QUEUE_BACKEND):
+    if name == "local":
+        return LocalQueueBackend()
+    if name == "celery":
+        return CeleryQueueBackend()
+    raise ValueError(f"Unknown QUEUE_BACKEND: {name!r} (expected 'celery' or 'local')")
+
+
+queue_backend = make_queue_backend()
@@ -0,0 +1,144 @@
+"""
+Deterministic financial ratio engine over the parsed statement tables.
+
+Pulls the line items the risk analysis needs out of the balance sheet and
+income statement DataFrames (tables.py) into one items x periods NumPy
+matrix, then computes the current ratio, quick ratio, debt-to-equity and
+interest coverage for every period at once, plus their period-over-period
+changes. The result is rendered as a small CSV block and passed to the crew
+as the `financial_ratios` input, so the LLM cites the ratios instead of
+deriving them from raw text.
+"""
+
+import re
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from cache import document_cache, sha256_file
+from extraction import EXTRACTION_VERSION
+from tables import load_tables, StatementTable, TABLES_VERSION
+
+# Line item -> (label pattern, statement searched first).
+LINE_ITEMS = {
+    "total_current_assets": (r"total current assets", "balance_sheet"),
+    "total_current_liabilities": (r"total current liabilities", "balance_sheet"),
+    "inventories": (r"inventor(?:y|ies)", "balance_sheet"),
+    "cash": (r"cash and (?:cash )?equivalents", "balance_sheet"),
+    "short_term_investments": (r"short[- ]term investments|marketable securities", "balance_sheet"),
+    "receivables": (r"(?:accounts |trade )?receivables?|accounts receivable", "balance_sheet"),
+    "long_term_debt": (r"long[- ]term debt", "balance_sheet"),
+    "short_term_debt": (r"short[- ]term (?:debt|borrowings)|current portion of long[- ]term debt", "balance_sheet"),
+    "total_liabilities": (r"total liabilities$", "balance_sheet"),
+    "equity": (r"(?:total )?(?:stockholders|shareholders)['’]? equity", "balance_sheet"),
+    "operating_income": (r"operating income|income from operations|operating profit", "income_statement"),
+    "interest_expense": (r"interest expense", "income_statement"),
+}
+_ITEM_ROW = {name: i for i, name in enumerate(LINE_ITEMS)}
+
+RATIOS = ("current_ratio", "quick_ratio", "debt_to_equity", "interest_coverage")
+
+# Bump when line item matching or the rendered block changes.
+RATIOS_VERSION = 1
+
+
+def _period_order(periods) -> list:
+    """Oldest first: years sort numerically; otherwise statements list the latest period first."""
+    if all(re.fullmatch(r"\d{4}", p) for p in periods):
+        return sorted(periods)
+    return list(reversed(periods))
+
+
+def line_item_matrix(tables: Dict[str, StatementTable]) -> pd.DataFrame:
+    """
+    The ratio inputs as an items x periods frame of amounts in units.
+
+    Each item is the first row whose label starts with its pattern, looked
+    up in its own statement first and then in the others; items not found
+    are NaN.
+    """
+    frames = {name: table.frame() for name, table in tables.items()}
+    periods = list(dict.fromkeys(p for frame in frames.values() for p in frame.columns[1:]))
+    matrix = pd.DataFrame(np.nan, index=list(LINE_ITEMS), columns=_period_order(periods))
+
+    for item, (pattern, statement) in LINE_ITEMS.items():
+        for _, df in sorted(frames.items(), key=lambda kv: kv[0] != statement):
+            hits = df["line_item"].str.lower().str.match(pattern, na=False).to_numpy()
+            if hits.any():
+                row = df.loc[hits].iloc[0]
+                matrix.loc[item, df.columns[1:]] = row[df.columns[1:]].to_numpy(np.float64)
+                break
+    return matrix
+
+
+def compute_ratios(items: pd.DataFrame) -> pd.DataFrame:
+    """Ratios x periods, computed for all periods at once; NaN where an input is missing."""
+    v = items.reindex(list(LINE_ITEMS)).to_numpy(np.float64)
+    item = lambda name: v[_ITEM_ROW[name]]  # noqa: E731
+
+    def total(*names):
+        """Sum of the items present; NaN only where all of them are missing."""
+        rows = np.vstack([item(n) for n in names])
+        return np.where(np.isnan(rows).all(axis=0), np.nan, np.nansum(rows, axis=0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Quick assets: current assets less inventories, else the liquid items themselves.
+        quick_assets = np.where(
+            np.isnan(item("inventories")),
+            total("cash", "short_term_investments", "receivables"),
+            item("total_current_assets") - item("inventories"),
+        )
+        debt = total("long_term_debt", "short_term_debt")
+        debt = np.where(np.isnan(debt), item("total_liabilities"), debt)
+        ratios = np.vstack([
+            item("total_current_assets") / item("total_current_liabilities"),
+            quick_assets / item("total_current_liabilities"),
+            debt / item("equity"),
+            item("operating_income") / np.abs(item("interest_expense")),
+        ])
+    ratios[~np.isfinite(ratios)] = np.nan
+    return pd.DataFrame(ratios, index=list(RATIOS), columns=items.columns)
+
+
+def with_changes(ratios: pd.DataFrame) -> pd.DataFrame:
+    """Append one column per consecutive pair of periods with the change in each ratio."""
+    values = ratios.to_numpy()
+    changes = np.diff(values, axis=1)
+    columns = [f"change {a}->{b}" for a, b in zip(ratios.columns[:-1], ratios.columns[1:])]
+    return pd.concat([ratios, pd.DataFrame(changes, index=ratios.index, columns=columns)], axis=1)
+
+
+def _render(tables: Dict[str, StatementTable]) -> str:
+    if not tables:
+        return "Not available: no financial statement tables were found in this document."
+
+    items = line_item_matrix(tables)
+    ratios = with_changes(compute_ratios(items))
+    if ratios[list(items.columns)].isna().all(axis=None):
+        return "Not available: the statements lack the line items these ratios need."
+
+    found = items.dropna(how="all")
+    return (
+        "ratio," + ",".join(ratios.columns) + "\n"
+        + ratios.to_csv(header=False, float_format="%.2f", na_rep="n/a")
+        + "\ninputs (amounts in units)," + ",".join(found.columns) + "\n"
+        + found.to_csv(header=False, float_format="%.15g", na_rep="n/a")
+    ).strip()
+
+
+def ratio_context(path: str, sha256: Optional[str] = None) -> str:
+    """
+    The precomputed ratios (and the inputs they came from) as text for the
+    task prompt. Built at extraction and cached per document hash.
+    """
+    sha256 = sha256 or sha256_file(path)
+    key = f"{sha256}-ratios-v{RATIOS_VERSION}-tables-v{TABLES_VERSION}-text-v{EXTRACTION_VERSION}"
+
+    cached = document_cache.get(key)
+    if cached is not None:
+        return cached["text"]
+
+    text = _render(load_tables(path, sha256=sha256))
+    document_cache.put(key, {"text": text})
+    return text
@@ -0,0 +1,194 @@
+"""
+Query-relevant passage retrieval over an extracted document.
+
+The document is split into overlapping word windows that never cross a page
+boundary, and a BM25 index over them is stored as term-major sparse postings
+(NumPy arrays: CSR indptr, chunk ids, term frequencies). Scoring a query only
+touches the postings of its terms. The index is built once, when the document
+is extracted, and kept in the document cache next to the text it points into,
+so the passage search tool hands the LLM a few pages' worth of text instead of
+the whole filing.
+"""
+
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from cache import document_cache, sha256_file, MemoryLRU
+from extraction import ExtractedDocument, load_document, EXTRACTION_VERSION
+
+PASSAGE_CHUNK_WORDS = int(os.getenv("PASSAGE_CHUNK_WORDS", "120"))
+PASSAGE_CHUNK_OVERLAP = int(os.getenv("PASSAGE_CHUNK_OVERLAP", "30"))
+PASSAGE_TOP_K = int(os.getenv("PASSAGE_TOP_K", "5"))
+
+# Bump when chunking, tokenization or the payload layout changes.
+RETRIEVAL_VERSION = 1
+
+# Deserialized indexes kept in memory per process (least recently used dropped first).
+_MEMORY_INDEXES = 8
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"\S+")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "what which with how why when where who do does did about".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms, without stopwords."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class Passage(NamedTuple):
+    page: int      # zero-based
+    score: float
+    text: str
+
+
+class PassageIndex:
+    """BM25 index over the chunks of one extracted document."""
+
+    def __init__(self, text: str, spans: np.ndarray, vocab: List[str], indptr: np.ndarray,
+                 chunk_ids: np.ndarray, term_freqs: np.ndarray, chunk_lengths: np.ndarray):
+        self.text = text
+        self.spans = spans                  # (n_chunks, 3): start offset, end offset, page
+        self.vocab = {term: i for i, term in enumerate(vocab)}
+        self.indptr = indptr                # postings of term t: [indptr[t], indptr[t + 1])
+        self.chunk_ids = chunk_ids
+        self.term_freqs = term_freqs
+        self.chunk_lengths = chunk_lengths
+
+        n_chunks = len(spans)
+        doc_freqs = np.diff(indptr)
+        self.idf = np.log1p((n_chunks - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = chunk_lengths.mean() if n_chunks else 1.0
+        self._length_norm = (BM25_K1 * (1 - BM25_B + BM25_B * chunk_lengths / max(avg_length, 1.0))).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    @classmethod
+    def build(cls, document: ExtractedDocument, chunk_words: int = PASSAGE_CHUNK_WORDS,
+              overlap: int = PASSAGE_CHUNK_OVERLAP) -> "PassageIndex":
+        """Chunk every page into windows of `chunk_words` words overlapping by `overlap`."""
+        step = max(1, chunk_words - overlap)
+        spans = []
+        for page_number, page_start in enumerate(document.page_offsets):
+            words = [m.span() for m in _WORD.finditer(document.page(page_number))]
+            for i in range(0, len(words), step):
+                window = words[i:i + chunk_words]
+                spans.append((page_start + window[0][0], page_start + window[-1][1], page_number))
+                if i + chunk_words >= len(words):
+                    break
+
+        vocab, term_ids, chunk_of_term = {}, [], []
+        for chunk_id, (start, end, _) in enumerate(spans):
+            for term in tokenize(document.text[start:end]):
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                chunk_of_term.append(chunk_id)
+
+        n_chunks, n_terms = len(spans), len(vocab)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        chunk_of_term = np.asarray(chunk_of_term, dtype=np.int64)
+        # Unique (term, chunk) keys come out sorted term-major: exactly the CSR order.
+        keys, counts = np.unique(term_ids * max(n_chunks, 1) + chunk_of_term, return_counts=True)
+        posting_terms = keys // max(n_chunks, 1)
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(posting_terms, minlength=n_terms), out=indptr[1:])
+
+        return cls(
+            document.text,
+            np.asarray(spans, dtype=np.int64).reshape(-1, 3),
+            list(vocab),
+            indptr,
+            (keys % max(n_chunks, 1)).astype(np.int32),
+            counts.astype(np.float32),
+            np.bincount(chunk_of_term, minlength=n_chunks).astype(np.float32),
+        )
+
+    def to_payload(self) -> dict:
+        return {
+            "spans": self.spans.ravel().tolist(),
+            "vocab": list(self.vocab),
+            "indptr": self.indptr.tolist(),
+            "chunk_ids": self.chunk_ids.tolist(),
+            "term_freqs": self.term_freqs.astype(np.int32).tolist(),
+            "chunk_lengths": self.chunk_lengths.astype(np.int32).tolist(),
+        }
+
+    @classmethod
+    def from_payload(cls, text: str, payload: dict) -> "PassageIndex":
+        return cls(
+            text,
+            np.asarray(payload["spans"], dtype=np.int64).reshape(-1, 3),
+            payload["vocab"],
+            np.asarray(payload["indptr"], dtype=np.int64),
+            np.asarray(payload["chunk_ids"], dtype=np.int32),
+            np.asarray(payload["term_freqs"], dtype=np.float32),
+            np.asarray(payload["chunk_lengths"], dtype=np.float32),
+        )
+
+    def search(self, query: str, top_k: int = PASSAGE_TOP_K) -> List[Passage]:
+        """Return up to `top_k` passages matching `query`, best first."""
+        top_k = max(1, top_k)
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in set(tokenize(query)):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            lo, hi = self.indptr[t], self.indptr[t + 1]
+            chunks, tf = self.chunk_ids[lo:hi], self.term_freqs[lo:hi]
+            scores[chunks] += self.idf[t] * tf * (BM25_K1 + 1) / (tf + self._length_norm[chunks])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        best = matched[np.argsort(-scores[matched], kind="stable")]
+        return [
+            Passage(int(self.spans[c, 2]), float(scores[c]), self.text[self.spans[c, 0]:self.spans[c, 1]])
+            for c in best
+        ]
+
+
+_indexes = MemoryLRU(_MEMORY_INDEXES)
+
+
+def load_passage_index(path: str, sha256: Optional[str] = None) -> PassageIndex:
+    """
+    Return the passage index of a PDF, building and caching it on first use.
+
+    Served from this process's memory, then from the document cache; only a
+    document never indexed before is chunked and indexed here.
+    """
+    sha256 = sha256 or sha256_file(path)
+    key = f"{sha256}-passages-v{RETRIEVAL_VERSION}-text-v{EXTRACTION_VERSION}"
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+
+    document = load_document(path, sha256=sha256)
+    payload = document_cache.get(key)
+    if payload is not None:
+        index = PassageIndex.from_payload(document.text, payload)
+    else:
+        index = PassageIndex.build(document)
+        document_cache.put(key, index.to_payload())
+
+    _indexes.put(key, index)
+    return index
+
+
+def format_passages(passages: List[Passage], total: int) -> str:
+    """Render passages for the LLM, each tagged with its (one-based) page."""
+    if not passages:
+        return "No passage matched these keywords. Try other terms (e.g. line item names or section titles)."
+    blocks = [f"Top {len(passages)} of {total} passages:"]
+    for passage in passages:
+        blocks.append(f"[page {passage.page + 1} | score {passage.score:.2f}]\n{passage.text.strip()}")
+    return "\n\n".join(blocks)
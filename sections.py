@@ -0,0 +1,209 @@
+"""
+Financial statement section index for extracted documents.
+
+Detected once per document, right after extraction: from the PDF outline
+(bookmarks) when the file has one, otherwise from heading lines that match
+the standard statement titles. The index maps each section to a zero-based
+inclusive page range and is stored in the document cache, so the section
+reader tool resolves a name with dictionary lookups and hands the LLM only
+those pages.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from cache import document_cache, sha256_file, MemoryLRU
+from extraction import ExtractedDocument, load_document, EXTRACTION_VERSION
+
+# Longest page range the section reader returns in one call.
+SECTION_MAX_PAGES = int(os.getenv("SECTION_MAX_PAGES", "10"))
+
+# Bump when detection or the stored layout changes.
+SECTIONS_VERSION = 1
+
+# Section indexes (with their document text) kept in memory per process.
+_MEMORY_INDEXES = 8
+
+# Canonical sections and the titles filings use for them.
+_SECTION_TITLES = {
+    "income_statement": r"(consolidated\s+)?(statements?\s+of\s+(comprehensive\s+)?(income|operations|earnings)"
+                        r"|income\s+statements?|profit\s+and\s+loss)",
+    "balance_sheet": r"(consolidated\s+)?(balance\s+sheets?|statements?\s+of\s+financial\s+(position|condition))",
+    "cash_flow": r"(consolidated\s+)?(statements?\s+of\s+cash\s+flows?|cash\s+flows?\s+statements?)",
+    "mdna": r"(management['’]?s\s+discussion\s+and\s+analysis|md\s*&\s*a\b)",
+    "risk_factors": r"risk\s+factors",
+    "notes": r"notes\s+to\s+(the\s+)?(consolidated\s+)?financial\s+statements",
+}
+_SECTION_PATTERNS = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in _SECTION_TITLES.items()}
+
+# Names agents are likely to ask for, normalized, mapped to canonical sections.
+SECTION_ALIASES = {
+    "income statement": "income_statement", "income": "income_statement",
+    "statement of operations": "income_statement", "statement of income": "income_statement",
+    "profit and loss": "income_statement", "p&l": "income_statement", "pnl": "income_statement",
+    "balance sheet": "balance_sheet", "statement of financial position": "balance_sheet",
+    "cash flow": "cash_flow", "cash flows": "cash_flow", "cash flow statement": "cash_flow",
+    "statement of cash flows": "cash_flow",
+    "mdna": "mdna", "md&a": "mdna", "management discussion": "mdna",
+    "management's discussion and analysis": "mdna", "managements discussion and analysis": "mdna",
+    "risk factors": "risk_factors", "risks": "risk_factors", "risk": "risk_factors",
+    "notes": "notes", "notes to financial statements": "notes",
+}
+
+# "Item 7." / "ITEM 1A -" prefixes of 10-K headings.
+_ITEM_PREFIX = re.compile(r"^\s*(item\s+\d+[a-z]?\s*[.:\-–—]?\s*)?", re.IGNORECASE)
+# Table-of-contents lines end in a page number ("Risk Factors ..... 12").
+_TOC_LINE = re.compile(r"(\.{3,}|\s\d{1,3})\s*$")
+_HEADING_MAX_CHARS = 100
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[\s_]+", " ", name.strip().lower())
+
+
+def _canonical(title: str) -> Optional[str]:
+    """The canonical section a heading or bookmark title starts, if any."""
+    title = title[_ITEM_PREFIX.match(title).end():]
+    for name, pattern in _SECTION_PATTERNS.items():
+        if pattern.match(title):
+            return name
+    return None
+
+
+def _outline_starts(path: str) -> List[Tuple[int, int, str]]:
+    """(page, depth, title) of every bookmark in the PDF, in page order."""
+    try:
+        reader = PdfReader(path)
+        outline = reader.outline
+    except Exception:
+        return []  # unreadable outline: fall back to headings
+
+    entries = []
+
+    def walk(items, depth):
+        for entry in items:
+            if isinstance(entry, list):  # children of the previous bookmark
+                walk(entry, depth + 1)
+                continue
+            try:
+                page = reader.get_destination_page_number(entry)
+            except Exception:
+                continue
+            if page is not None and page >= 0:
+                entries.append((page, depth, str(entry.title).strip()))
+
+    walk(outline, 0)
+    return sorted(entries, key=lambda e: e[0])
+
+
+def _heading_starts(document: ExtractedDocument) -> List[Tuple[int, int, str]]:
+    """(page, 0, heading) of the first heading line found for each canonical section."""
+    found: Dict[str, Tuple[int, int, str]] = {}
+    for page_number in range(len(document.page_offsets)):
+        page_hits = {}
+        for line in document.page(page_number).split("\n"):
+            line = line.strip()
+            if not line or len(line) > _HEADING_MAX_CHARS or _TOC_LINE.search(line):
+                continue
+            name = _canonical(line)
+            if name and name not in found:
+                page_hits.setdefault(name, line)
+        # A page naming three or more sections is a table of contents.
+        if len(page_hits) >= 3:
+            continue
+        for name, line in page_hits.items():
+            found[name] = (page_number, 0, line)
+    return sorted(found.values())
+
+
+def detect_sections(path: str, document: ExtractedDocument) -> dict:
+    """
+    Build the section index of a document.
+
+    Returns:
+        dict: {"source": "outline" | "headings" | "none", "page_count": int,
+        "sections": {key: {"title", "start", "end"}}} with zero-based,
+        inclusive page ranges. Keys are canonical names (e.g. "balance_sheet")
+        or, for other bookmarks, the normalized bookmark title.
+    """
+    page_count = len(document.page_offsets)
+    starts, source = _outline_starts(path), "outline"
+    if not starts:
+        starts, source = _heading_starts(document), "headings"
+
+    sections = {}
+    for i, (start, depth, title) in enumerate(starts):
+        if start >= page_count:
+            continue
+        # A section runs until the page before the next bookmark at the same
+        # or a higher level; sections starting on the same page share it.
+        next_start = next((s for s, d, _ in starts[i + 1:] if d <= depth and s > start), page_count)
+        end = min(next_start, page_count) - 1
+        key = _canonical(title) or normalize_name(title)
+        sections.setdefault(key, {"title": title, "start": start, "end": end})
+
+    return {"source": source if sections else "none", "page_count": page_count, "sections": sections}
+
+
+class SectionIndex:
+    """Section name -> page range of one document."""
+
+    def __init__(self, document: ExtractedDocument, data: dict):
+        self.document = document
+        self.source = data["source"]
+        self.sections = data["sections"]
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Map a requested name (alias, canonical key or bookmark title) to a section key."""
+        key = normalize_name(name)
+        key = SECTION_ALIASES.get(key, key)
+        if key in self.sections:
+            return key
+        key = key.replace(" ", "_")
+        return key if key in self.sections else None
+
+    def read(self, name: str, max_pages: int = SECTION_MAX_PAGES) -> str:
+        """Text of the pages of a section, or a list of the available sections."""
+        key = self.resolve(name)
+        if key is None:
+            available = ", ".join(f"{k} ({s['title']})" for k, s in self.sections.items()) or "none detected"
+            return f"Section '{name}' not found in this document. Available sections: {available}."
+
+        section = self.sections[key]
+        end = min(section["end"], section["start"] + max_pages - 1)
+        pages = "".join(
+            f"[page {n + 1}]\n{self.document.page(n)}" for n in range(section["start"], end + 1)
+        )
+        more = ""
+        if end < section["end"]:
+            more = f"\n[Section continues to page {section['end'] + 1}; only the first {max_pages} pages are shown.]"
+        return f"{section['title']} (pages {section['start'] + 1}-{section['end'] + 1})\n\n{pages}{more}"
+
+
+_indexes = MemoryLRU(_MEMORY_INDEXES)
+
+
+def load_section_index(path: str, sha256: Optional[str] = None) -> SectionIndex:
+    """
+    Return the section index of a PDF, detecting and caching it on first use.
+
+    Served from this process's memory, so a tool call resolving a section
+    costs a stat of the PDF and a dict lookup, whatever the document size.
+    """
+    sha256 = sha256 or sha256_file(path)
+    key = f"{sha256}-sections-v{SECTIONS_VERSION}-text-v{EXTRACTION_VERSION}"
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+
+    document = load_document(path, sha256=sha256)
+    data = document_cache.get(key)
+    if data is None:
+        data = detect_sections(path, document)
+        document_cache.put(key, data)
+    index = SectionIndex(document, data)
+    _indexes.put(key, index)
+    return index
@@ -0,0 +1,171 @@
+"""
+Financial statement tables as typed pandas DataFrames.
+
+Runs once per document after the section index: the pages of the income
+statement, balance sheet and cash flow statement are parsed into one
+DataFrame per statement, a `line_item` column plus one float column per
+period. Cells are parsed with vectorized string operations. Parenthesized
+amounts become negative, dashes become zero, and the "(in thousands)" /
+"(in millions)" unit of the statement is applied to every amount except
+per-share and percentage rows. The parsed values are cached per document
+hash as CSV in the statement's own unit, which is also what the table
+reader tool hands the agent: a few tokens per cell and nothing to re-parse.
+"""
+
+import io
+import re
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from cache import document_cache, sha256_file, MemoryLRU
+from extraction import (EXTRACTION_VERSION, GROUPED_NUMBER as _GROUPED_NUMBER, PERIOD_YEAR as _YEAR,
+                        UNIT_LINE as _UNIT)
+from sections import load_section_index, SectionIndex
+
+# Sections parsed into tables.
+STATEMENT_SECTIONS = ("income_statement", "balance_sheet", "cash_flow")
+
+# Bump when parsing or the cached layout changes.
+TABLES_VERSION = 1
+
+# Parsed documents kept in memory per process.
+_MEMORY_TABLES = 8
+
+UNIT_SCALES = {"units": 1.0, "thousands": 1e3, "millions": 1e6, "billions": 1e9}
+
+# One amount: 1,234 / (1,234) / -12.5 / 35.2% / an em or en dash for zero.
+_AMOUNT = r"(?:\(?-?\d[\d,]*(?:\.\d+)?\)?%?|[—–-])"
+# A row is a label containing a letter followed by one or more amounts.
+_ROW = re.compile(rf"^(?P<label>.*?[A-Za-z].*?)\s+(?P<amounts>{_AMOUNT}(?:\s+{_AMOUNT})*)\s*$")
+# Rows whose amounts are not in the statement unit.
+_UNSCALED_ROW = re.compile(r"per\s+share|%", re.IGNORECASE)
+
+
+class StatementTable(NamedTuple):
+    title: str
+    start: int        # zero-based first page
+    end: int          # zero-based last page
+    unit: str         # "units", "thousands", "millions" or "billions"
+    csv: str          # line_item + periods, amounts as stated in the document
+
+    def frame(self) -> pd.DataFrame:
+        """Typed table with every amount scaled to units (per-share and % rows as stated)."""
+        df = pd.read_csv(io.StringIO(self.csv), dtype={"line_item": "string"})
+        periods = df.columns[1:]
+        df[periods] = df[periods].astype(np.float64)
+        scaled = ~df["line_item"].str.contains(_UNSCALED_ROW, na=False).to_numpy()
+        df.loc[scaled, periods] *= UNIT_SCALES[self.unit]
+        return df
+
+    def for_agent(self) -> str:
+        pages = f"pages {self.start + 1}-{self.end + 1}"
+        unit = "" if self.unit == "units" else f", amounts in {self.unit} except per-share and % rows"
+        return f"{self.title} ({pages}{unit})\n{self.csv}"
+
+
+def _periods(lines: pd.Series):
+    """(line number, period labels) of the first header line naming two or more years."""
+    years = lines.str.findall(_YEAR)
+    header = (years.str.len() >= 2) & ~lines.str.contains(_GROUPED_NUMBER)
+    if not header.any():
+        return None, None
+    line_number = header.idxmax()
+    return line_number, list(dict.fromkeys(years[line_number]))
+
+
+def parse_statement(text: str):
+    """
+    Parse the text of statement pages into (DataFrame of as-stated amounts, unit).
+
+    The frame has a `line_item` column plus one float column per period,
+    named after the years in the header line ("2024", "2023"), or
+    "period_1", ... when there is none. Rows with fewer amounts than periods
+    (page numbers, note references) are dropped; extra leading amounts are
+    ignored, so each row is right-aligned to the period columns.
+    """
+    unit_match = _UNIT.search(text)
+    unit = unit_match.group(1).lower() if unit_match else "units"
+
+    lines = pd.Series(text.replace("$", "").split("\n"), dtype="string").str.strip()
+    header_line, periods = _periods(lines)
+    if header_line is not None:
+        lines = lines.drop(index=header_line)
+
+    rows = lines.str.extract(_ROW).dropna()
+    amounts = rows["amounts"].str.split()
+    counts = amounts.str.len()
+    if periods is None:
+        if counts.empty:
+            return pd.DataFrame(columns=["line_item"]), unit
+        periods = [f"period_{i + 1}" for i in range(int(counts.mode().iloc[0]))]
+    n = len(periods)
+    keep = counts >= n
+    rows, amounts = rows[keep], amounts[keep]
+    if rows.empty:
+        return pd.DataFrame(columns=["line_item", *periods]), unit
+
+    cells = pd.DataFrame(amounts.str[-n:].tolist(), index=rows.index, columns=periods)
+    flat = cells.stack()
+    percent = flat.str.endswith("%").groupby(level=0).any()
+    negative = flat.str.contains(r"^(?:\(|-\d)")
+    digits = flat.str.replace(r"[(),%\-]", "", regex=True).replace({"—": "0", "–": "0", "": "0"})
+    values = pd.to_numeric(digits, errors="coerce").where(~negative, lambda v: -v)
+
+    labels = rows["label"].str.strip().str.rstrip(":")
+    labels = labels.where(~percent.reindex(labels.index, fill_value=False), labels + " (%)")
+    frame = values.unstack()[periods]
+    frame.insert(0, "line_item", labels)
+    return frame.reset_index(drop=True), unit
+
+
+def extract_tables(sections: SectionIndex) -> Dict[str, StatementTable]:
+    """Parse every statement section of a document into a StatementTable."""
+    tables = {}
+    for name in STATEMENT_SECTIONS:
+        section = sections.sections.get(name)
+        if section is None:
+            continue
+        text = "".join(sections.document.page(n) for n in range(section["start"], section["end"] + 1))
+        frame, unit = parse_statement(text)
+        if len(frame):
+            tables[name] = StatementTable(section["title"], section["start"], section["end"], unit,
+                                          frame.to_csv(index=False, float_format="%.15g"))
+    return tables
+
+
+_tables = MemoryLRU(_MEMORY_TABLES)
+
+
+def load_tables(path: str, sha256: Optional[str] = None) -> Dict[str, StatementTable]:
+    """
+    Return the statement tables of a PDF, parsing and caching them on first use.
+
+    Served from this process's memory first, then from the document cache.
+    """
+    sha256 = sha256 or sha256_file(path)
+    key = f"{sha256}-tables-v{TABLES_VERSION}-text-v{EXTRACTION_VERSION}"
+    tables = _tables.get(key)
+    if tables is not None:
+        return tables
+
+    cached = document_cache.get(key)
+    if cached is not None:
+        tables = {name: StatementTable(**table) for name, table in cached.items()}
+    else:
+        tables = extract_tables(load_section_index(path, sha256=sha256))
+        document_cache.put(key, {name: table._asdict() for name, table in tables.items()})
+    _tables.put(key, tables)
+    return tables
+
+
+def read_table(path: str, name: str) -> str:
+    """A statement table as CSV for the agent, or the list of available statements."""
+    sha256 = sha256_file(path)
+    tables = load_tables(path, sha256=sha256)
+    key = load_section_index(path, sha256=sha256).resolve(name)
+    if key in tables:
+        return tables[key].for_agent()
+    available = ", ".join(f"{k} ({t.title})" for k, t in tables.items()) or "none detected"
+    return f"No table for '{name}' in this document. Available statements: {available}."
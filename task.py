@@ -2,7 +2,7 @@
 from crewai import Task
 
 from agents import financial_analyst, verifier
-from tools import search_tool, FinancialDocumentTool
+from tools import search_tool, document_tools
 
 # PROMPT FIX: Task descriptions originally told agents to ignore the user query,
 # make up URLs, hallucinate data, and contradict themselves.
@@ -12,7 +12,8 @@ from tools import search_tool, FinancialDocumentTool
 # the FastAPI endpoint function of the same name in main.py. Renamed to 'analysis_task'.
 analysis_task = Task(
     description=(
-        "Read the financial document located at the file path provided in the context. "
+        "Read the financial document located at: {file_path}. "
+        "Pass this exact path as `path` to every document tool.\n\n"
         "Answer the user's query: {query}\n\n"
         "Your analysis must:\n"
         "1. Extract and summarize key financial metrics (revenue, profit, margins, cash flow, debt, etc.)\n"
@@ -20,6 +21,9 @@ analysis_task = Task(
         "3. Highlight key risks mentioned or implied in the document\n"
         "4. Provide data-driven investment considerations\n"
         "5. Cite specific figures and sections from the document to support all claims\n\n"
+        "Precomputed ratios (deterministic, from the parsed statements, oldest period first):\n"
+        "{financial_ratios}\n\n"
+        "Use these liquidity and leverage ratios as given instead of recomputing them.\n\n"
         "Do NOT fabricate data, URLs, or statistics not present in the document."
     ),
     expected_output=(
@@ -33,7 +37,7 @@ analysis_task = Task(
         "personalized financial advice. Consult a licensed financial advisor before making investment decisions.'"
     ),
     agent=financial_analyst,
-    tools=[FinancialDocumentTool.read_data_tool],
+    tools=document_tools(),
     async_execution=False,
 )
 
@@ -41,6 +45,7 @@ investment_analysis_task = Task(
     description=(
         "Based on the financial data extracted from the document, provide an objective "
         "investment analysis in response to: {query}\n\n"
+        "The document is at: {file_path}. Pass this exact path as `path` to every document tool.\n\n"
         "Focus on:\n"
         "1. Valuation indicators (P/E, P/B, EV/EBITDA if available)\n"
         "2. Growth trajectory based on reported figures\n"
@@ -58,19 +63,24 @@ investment_analysis_task = Task(
         "- Appropriate disclaimer about not constituting personalized advice"
     ),
     agent=financial_analyst,
-    tools=[FinancialDocumentTool.read_data_tool],
+    tools=document_tools(),
     async_execution=False,
 )
 
 risk_assessment_task = Task(
     description=(
         "Perform a structured risk assessment of the financial document in context of: {query}\n\n"
+        "The document is at: {file_path}. Pass this exact path as `path` to every document tool.\n\n"
         "Evaluate:\n"
         "1. Liquidity risk (current ratio, quick ratio, cash position)\n"
         "2. Leverage risk (debt-to-equity, interest coverage)\n"
         "3. Market/revenue risk (revenue concentration, geographic exposure)\n"
         "4. Operational risks mentioned in management discussion\n"
         "5. Regulatory or legal risks disclosed\n\n"
+        "Precomputed ratios (deterministic, from the parsed statements, oldest period first):\n"
+        "{financial_ratios}\n\n"
+        "Use these ratios and changes for items 1 and 2 as given; do not recompute them. "
+        "Only read the document for what they do not cover.\n\n"
         "Base all risk ratings on actual data from the document."
     ),
     expected_output=(
@@ -83,13 +93,14 @@ risk_assessment_task = Task(
         "- Note: Risk assessments are general and should be combined with professional advice"
     ),
     agent=financial_analyst,
-    tools=[FinancialDocumentTool.read_data_tool],
+    tools=document_tools(),
     async_execution=False,
 )
 
 verification_task = Task(
     description=(
         "Verify whether the uploaded document is a legitimate financial document.\n\n"
+        "The document is at: {file_path}. Pass this exact path as `path` to every document tool.\n\n"
         "Check for the presence of:\n"
         "1. Standard financial statements (income statement, balance sheet, cash flow)\n"
         "2. Financial figures (revenue, expenses, assets, liabilities)\n"
@@ -106,6 +117,6 @@ verification_task = Task(
         "- Any concerns about document completeness or authenticity"
     ),
     agent=financial_analyst,
-    tools=[FinancialDocumentTool.read_data_tool],
+    tools=document_tools(),
     async_execution=False
 )
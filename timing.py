@@ -0,0 +1,79 @@
+"""
+Per-stage timing instrumentation for analyses.
+
+A StageTimer records when each pipeline stage finished and how long it took
+since the previous one, plus every LLM call made while it is active. The
+result is stored as JSON on AnalysisRecord.stage_timings so a slow request can
+be attributed to queueing, upload, extraction, the LLM or the database.
+"""
+
+import contextvars
+import json
+import time
+import datetime
+from contextlib import contextmanager
+from typing import Optional
+
+_active_timer = contextvars.ContextVar("active_stage_timer", default=None)
+
+
+class StageTimer:
+    """Collects stage timestamps and durations for one analysis."""
+
+    def __init__(self, stored: Optional[str] = None):
+        data = json.loads(stored) if stored else {}
+        self.stages = data.get("stages", [])
+        self.llm_calls = data.get("llm_calls", [])
+        # Resume from the last stored stage (e.g. "enqueued" written by the API).
+        self._last = self.stages[-1]["ts"] if self.stages else None
+
+    def mark(self, stage: str):
+        """Record that `stage` just finished."""
+        now = time.time()
+        self.stages.append({
+            "stage": stage,
+            "at": datetime.datetime.utcfromtimestamp(now).isoformat(),
+            "ts": now,
+            "seconds": round(now - self._last, 4) if self._last is not None else 0.0,
+        })
+        self._last = now
+
+    def record_llm_call(self, model: str, seconds: float, cached: bool):
+        self.llm_calls.append({
+            "model": model,
+            "seconds": round(seconds, 4),
+            "cached": cached,
+        })
+
+    @contextmanager
+    def activate(self):
+        """Attribute LLM calls made in this context (thread) to this timer."""
+        token = _active_timer.set(self)
+        try:
+            yield self
+        finally:
+            _active_timer.reset(token)
+
+    def to_json(self) -> str:
+        return json.dumps({"stages": self.stages, "llm_calls": self.llm_calls})
+
+
+def active_timer() -> Optional[StageTimer]:
+    """Return the timer active in the current context, if any."""
+    return _active_timer.get()
+
+
+def timings_response(stored: Optional[str]) -> Optional[dict]:
+    """Shape stored timings for API responses: per-stage durations plus LLM call stats."""
+    if not stored:
+        return None
+    data = json.loads(stored)
+    calls = data.get("llm_calls", [])
+    return {
+        "stages": [
+            {"stage": s["stage"], "at": s["at"], "seconds": s["seconds"]}
+            for s in data.get("stages", [])
+        ],
+        "llm_calls": calls,
+        "llm_total_seconds": round(sum(c["seconds"] for c in calls), 4),
+    }
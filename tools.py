@@ -7,11 +7,20 @@ load_dotenv()
 # Correct import for SerperDevTool:
 from crewai_tools import SerperDevTool
 
-# BUG FIX 2: Pdf/PDFMinerLoader was never imported. Using langchain's PyPDFLoader.
-from langchain_community.document_loaders import PyPDFLoader
-
 from crewai.tools import tool
 
+# BUG FIX 2: Pdf/PDFMinerLoader was never imported. Pages are now read through
+# extraction.py, which streams them from pypdf (the library PyPDFLoader wraps).
+from extraction import load_document, normalize_text
+from retrieval import load_passage_index, format_passages, PASSAGE_TOP_K
+from sections import load_section_index
+from tables import read_table
+
+# "passages" (default): agents read statement tables or sections, or search
+# the document for the passages relevant to the query. "full": agents read the
+# whole text, as before.
+DOCUMENT_READ_MODE = os.getenv("DOCUMENT_READ_MODE", "passages").lower()
+
 ## Creating search tool
 search_tool = SerperDevTool()
 
@@ -20,32 +29,77 @@ class FinancialDocumentTool():
 
     # BUG FIX 3: 'async def' makes this a coroutine — CrewAI tools must be synchronous.
     # BUG FIX 4: Missing @staticmethod decorator (method has no 'self' param).
-    # BUG FIX 5: 'Pdf' class was never imported/defined — replaced with PyPDFLoader.
+    # BUG FIX 5: 'Pdf' class was never imported/defined — pages are now read via extraction.py.
     @staticmethod
     @tool("Financial Document Reader")
     def read_data_tool(path: str = 'data/sample.pdf') -> str:
         """Tool to read data from a PDF file.
 
         Args:
-            path (str): Path of the PDF file. Defaults to 'data/sample.pdf'.
+            path (str): Path of the uploaded PDF, exactly as given in the task.
 
         Returns:
             str: Full text content of the financial document.
         """
-        loader = PyPDFLoader(file_path=path)
-        docs = loader.load()
+        # Served from the content-hash cache when this PDF was seen before;
+        # otherwise pages are normalized as they stream in and joined once.
+        return load_document(path).text
+
+    @staticmethod
+    @tool("Financial Document Passage Search")
+    def search_passages_tool(query: str, path: str = 'data/sample.pdf', top_k: int = PASSAGE_TOP_K) -> str:
+        """Search a financial PDF and return only the passages most relevant to a question.
+
+        Call it once per topic with specific keywords (e.g. "total revenue net income",
+        "long-term debt interest expense", "risk factors") instead of reading the whole document.
+
+        Args:
+            query (str): Keywords or question to look up in the document.
+            path (str): Path of the uploaded PDF, exactly as given in the task.
+            top_k (int): Number of passages to return.
 
-        full_report = ""
-        for data in docs:
-            content = data.page_content
+        Returns:
+            str: The best-matching passages, each tagged with its page number.
+        """
+        # BM25 index built at extraction time; served from memory or the document cache.
+        index = load_passage_index(path)
+        return format_passages(index.search(query, top_k=top_k), len(index))
 
-            # Remove extra whitespaces
-            while "\n\n" in content:
-                content = content.replace("\n\n", "\n")
+    @staticmethod
+    @tool("Financial Document Section Reader")
+    def read_section_tool(name: str, path: str = 'data/sample.pdf') -> str:
+        """Read one section of a financial PDF: only the pages of that section are returned.
 
-            full_report += content + "\n"
+        Use it for whole statements, e.g. "income statement", "balance sheet", "cash flow",
+        "MD&A" or "risk factors". An unknown name returns the list of sections found.
 
-        return full_report
+        Args:
+            name (str): Section to read.
+            path (str): Path of the uploaded PDF, exactly as given in the task.
+
+        Returns:
+            str: The text of the section's pages, each tagged with its page number.
+        """
+        # Section -> page range index detected at extraction time.
+        return load_section_index(path).read(name)
+
+    @staticmethod
+    @tool("Financial Statement Table Reader")
+    def read_table_tool(statement: str, path: str = 'data/sample.pdf') -> str:
+        """Read a financial statement as a CSV table (line item x period) with parsed numbers.
+
+        Use it for figures from "income statement", "balance sheet" or "cash flow".
+        Negative amounts are already signed; the header line states the unit.
+
+        Args:
+            statement (str): Statement to read.
+            path (str): Path of the uploaded PDF, exactly as given in the task.
+
+        Returns:
+            str: The statement's title, pages and unit, followed by its table as CSV.
+        """
+        # Parsed into DataFrames at extraction time and cached per document hash.
+        return read_table(path, statement)
 
 
 ## Creating Investment Analysis Tool
@@ -61,17 +115,8 @@ class InvestmentTool:
         Returns:
             str: Processed financial data ready for investment analysis.
         """
-        processed_data = financial_document_data
-
-        # Clean up double spaces
-        i = 0
-        while i < len(processed_data):
-            if processed_data[i:i+2] == "  ":
-                processed_data = processed_data[:i] + processed_data[i+1:]
-            else:
-                i += 1
-
-        return processed_data
+        # Shared linear-time normalizer (the old slicing loop was O(n²)).
+        return normalize_text(financial_document_data)
 
 
 ## Creating Risk Assessment Tool
@@ -88,3 +133,14 @@ class RiskTool:
             str: Processed data for risk assessment.
         """
         return financial_document_data
+
+
+def document_tools() -> list:
+    """The document reader tools handed to agents, per DOCUMENT_READ_MODE."""
+    if DOCUMENT_READ_MODE == "full":
+        return [FinancialDocumentTool.read_data_tool]
+    return [
+        FinancialDocumentTool.read_table_tool,
+        FinancialDocumentTool.read_section_tool,
+        FinancialDocumentTool.search_passages_tool,
+    ]
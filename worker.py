@@ -2,27 +2,36 @@
 Queue Worker using Celery + Redis.
 Handles concurrent document analysis requests without blocking the API.
 
-To run the worker:
-    celery -A worker worker --loglevel=info --concurrency=4
+Each analysis is a chain of two tasks on separate queues:
+- extract_document (CPU-bound PDF parsing) on the "extraction" queue
+- analyze_document (the crew run, mostly waiting on the LLM) on the "llm" queue
+
+To run the workers:
+    celery -A worker worker -Q extraction --pool=prefork --concurrency=<cores> --loglevel=info
+    celery -A worker worker -Q llm --pool=threads --concurrency=32 --loglevel=info
+
+A single worker can still consume both queues: -Q extraction,llm
 """
 
 import os
-import datetime
-import time
 
-from celery import Celery
+from celery import Celery, chain
+from celery.signals import worker_init, worker_process_init
 from dotenv import load_dotenv
 load_dotenv()
 
-from crewai import Crew, Process
-from agents import financial_analyst
-from task import analysis_task
-from database import SessionLocal, AnalysisRecord
+from crew_pool import crew_pool
+from pipeline import (
+    run_stage, extract_stage, analysis_stage, RetryStage, ANALYSIS_MAX_RETRIES, ANALYSIS_RETRY_COUNTDOWN,
+)
 
 # Redis is used as both the message broker and result backend.
 # Make sure Redis is running: docker run -d -p 6379:6379 redis
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+EXTRACTION_QUEUE = os.getenv("CELERY_EXTRACTION_QUEUE", "extraction")
+LLM_QUEUE = os.getenv("CELERY_LLM_QUEUE", "llm")
+
 celery_app = Celery(
     "financial_analyzer",
     broker=REDIS_URL,
@@ -37,68 +46,68 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     result_expires=86400,  # Results expire after 24 hours
+    task_routes={
+        "extract_document": {"queue": EXTRACTION_QUEUE},
+        "analyze_document": {"queue": LLM_QUEUE},
+    },
+    # Tasks are long and acknowledged late; don't let one worker hoard them.
+    worker_prefetch_multiplier=1,
 )
 
 
-@celery_app.task(bind=True, name="analyze_document")
+@worker_process_init.connect
+def warm_crew_pool(**_):
+    """Build this worker process's crews before it accepts tasks (prefork children)."""
+    crew_pool.warm()
+
+
+@worker_init.connect
+def warm_crew_pool_in_process(sender=None, **_):
+    """Thread and gevent pools run tasks in the worker process itself."""
+    if "prefork" not in str(getattr(sender, "pool_cls", "prefork")):
+        crew_pool.warm()
+
+
+# acks_late + reject_on_worker_lost: a job whose worker dies mid-run is
+# redelivered instead of lost, and resumes from its checkpoints.
+@celery_app.task(
+    bind=True,
+    name="extract_document",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=ANALYSIS_MAX_RETRIES,
+)
+def extract_document_task(self, task_id: str, query: str, file_path: str):
+    """CPU stage: parse the PDF so the LLM stage (and any retry) never does."""
+    try:
+        return run_stage(extract_stage, "started", task_id, query, file_path,
+                         attempt=self.request.retries, max_retries=self.max_retries)
+    except RetryStage as e:
+        raise self.retry(exc=e, countdown=ANALYSIS_RETRY_COUNTDOWN)
+
+
+@celery_app.task(
+    bind=True,
+    name="analyze_document",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=ANALYSIS_MAX_RETRIES,
+)
 def analyze_document_task(self, task_id: str, query: str, file_path: str):
     """
     Celery task that runs the CrewAI crew asynchronously.
     Updates the database with status, result, and timing info.
     """
-    db = SessionLocal()
-    start_time = time.time()
-
     try:
-        # Mark as processing
-        record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
-        if record:
-            record.status = "processing"
-            db.commit()
-
-        # Run the CrewAI crew
-        financial_crew = Crew(
-            agents=[financial_analyst],
-            tasks=[analysis_task],
-            process=Process.sequential,
-        )
-
-        result = financial_crew.kickoff(inputs={
-            "query": query,
-            "file_path": file_path,
-        })
-
-        duration = time.time() - start_time
-
-        # Save result to DB
-        if record:
-            record.status = "completed"
-            record.result = str(result)
-            record.completed_at = datetime.datetime.utcnow()
-            record.duration_seconds = round(duration, 2)
-            db.commit()
-
-        return {"status": "completed", "result": str(result)}
-
-    except Exception as e:
-        duration = time.time() - start_time
-
-        # Save error to DB
-        record = db.query(AnalysisRecord).filter(AnalysisRecord.id == task_id).first()
-        if record:
-            record.status = "failed"
-            record.error = str(e)
-            record.completed_at = datetime.datetime.utcnow()
-            record.duration_seconds = round(duration, 2)
-            db.commit()
-
-        raise self.retry(exc=e, countdown=5, max_retries=2)
-
-    finally:
-        # Clean up uploaded file after processing
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception:
-                pass
-        db.close()
+        return run_stage(analysis_stage, "llm_started", task_id, query, file_path,
+                         attempt=self.request.retries, max_retries=self.max_retries)
+    except RetryStage as e:
+        raise self.retry(exc=e, countdown=ANALYSIS_RETRY_COUNTDOWN)
+
+
+def enqueue_analysis(task_id: str, query: str, file_path: str):
+    """Queue extraction on the CPU queue, chained to the crew run on the LLM queue."""
+    chain(
+        extract_document_task.si(task_id, query, file_path).set(task_id=f"{task_id}-extract"),
+        analyze_document_task.si(task_id, query, file_path).set(task_id=task_id),
+    ).apply_async()